@@ -4,18 +4,57 @@ Author:Cynohalt 2972906133@qq.com
 This module is used for parsing SQL statements.
 You should use UTF8-encoding statements string or sql file.
 """
+from pysqlparse._lazy import attach as _attach
 
-from pysqlparse.statement import *
-from pysqlparse.sql import Sql
-from pysqlparse.pysqlparser import AbstractStatement
-from pysqlparse.pysqlparser import (
-    view,
-    delete,
-    query,
-    cte,
-    insert,
-    update,
-    create,
-    format,
-    strip_note
-)
+# Public names and the modules defining them. They are imported on first access, so
+# importing the package is cheap and e.g. strip_note only loads the extension.
+_LAZY = {
+    "Cte": "pysqlparse.statement",
+    "Insert": "pysqlparse.statement",
+    "Query": "pysqlparse.statement",
+    "TableDDL": "pysqlparse.statement",
+    "View": "pysqlparse.statement",
+    "Update": "pysqlparse.statement",
+    "Delete": "pysqlparse.statement",
+    "Sql": "pysqlparse.sql",
+    "format_file": "pysqlparse.sql",
+    "parse_many": "pysqlparse.batch",
+    "enable_cache": "pysqlparse.cache",
+    "disable_cache": "pysqlparse.cache",
+    "cache_info": "pysqlparse.cache",
+    "DiskCache": "pysqlparse.cache",
+    "fingerprint": "pysqlparse.lexer",
+    "AstNode": "pysqlparse.tree",
+    "AstList": "pysqlparse.tree",
+    "TokenStream": "pysqlparse.tokens",
+    "token_stream": "pysqlparse.tokens",
+    "tokenize_batch": "pysqlparse.tokens",
+    "type_count_matrix": "pysqlparse.tokens",
+    "aparse": "pysqlparse.aio",
+    "DependencyGraph": "pysqlparse.graph",
+    "InternTable": "pysqlparse.interning",
+    "enable_interning": "pysqlparse.interning",
+    "disable_interning": "pysqlparse.interning",
+    "memory_report": "pysqlparse.interning",
+    "parse_limited": "pysqlparse.limits",
+    "CancelToken": "pysqlparse.limits",
+    "set_profiler": "pysqlparse.profiler",
+    "PhaseStats": "pysqlparse.profiler",
+    "AbstractStatement": "pysqlparse.pysqlparser",
+    "view": "pysqlparse.pysqlparser",
+    "delete": "pysqlparse.pysqlparser",
+    "query": "pysqlparse.pysqlparser",
+    "cte": "pysqlparse.pysqlparser",
+    "insert": "pysqlparse.pysqlparser",
+    "update": "pysqlparse.pysqlparser",
+    "create": "pysqlparse.pysqlparser",
+    "format": "pysqlparse.pysqlparser",
+    "strip_note": "pysqlparse.pysqlparser",
+    "strip_note_stream": "pysqlparse.note",
+    "iter_strip_note": "pysqlparse.note",
+}
+
+__all__ = tuple(_LAZY)
+
+
+__getattr__, __dir__ = _attach(globals(), _LAZY)
@@ -0,0 +1,44 @@
+"""
+Lazy attribute loading shared by the pysqlparse packages.
+"""
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def attach(namespace: dict, names: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Build the module __getattr__ and __dir__ of a package whose public names are
+    imported on first access.
+
+    Args:
+        namespace: globals() of the package
+        names: Public names and the modules defining them
+
+    Returns:
+        (__getattr__, __dir__) to assign in the package
+    """
+    package = namespace["__name__"]
+
+    def __getattr__(name: str):
+        module = names.get(name)
+        if module is None:
+            return _submodule(package, name)
+        value = getattr(importlib.import_module(module), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(names))
+
+    return __getattr__, __dir__
+
+
+def _submodule(package: str, name: str):
+    # Submodules are attributes of the package only once imported.
+    if not name.startswith("__"):
+        try:
+            return importlib.import_module(f"{package}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{package}.{name}":
+                raise
+    raise AttributeError(f"module {package!r} has no attribute {name!r}")
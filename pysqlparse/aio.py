@@ -0,0 +1,132 @@
+"""
+asyncio-friendly parsing.
+
+Parsing runs on a small internal thread pool, off the event loop thread. Whether the
+loop keeps serving other tasks while a large statement is parsed depends on the native
+parser releasing the GIL during the parse, which the extension does not document; if
+it holds the GIL, the loop stalls for the duration of the native call. aparse() with
+executor="process" parses in a worker process instead and never blocks the loop, at the
+cost of sending the result back in its to_bytes() form (see pysqlparse.batch).
+
+Cancelling the awaiting task drops work that has not started yet. A native parse
+call that is already running finishes in the background, and its result is discarded.
+"""
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterator
+
+from pysqlparse import serial
+from pysqlparse.batch import EXECUTORS, parse_serialized, parse_statement
+from pysqlparse.conf import DEFAULT_ASYNC_WORKERS
+
+
+_executor = None
+_process_executor = None
+_executor_lock = threading.Lock()
+_workers = DEFAULT_ASYNC_WORKERS
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="pysqlparse")
+    return _executor
+
+
+def _get_process_executor() -> ProcessPoolExecutor:
+    global _process_executor
+    if _process_executor is None:
+        with _executor_lock:
+            if _process_executor is None:
+                _process_executor = ProcessPoolExecutor(max_workers=_workers)
+    return _process_executor
+
+
+def set_async_workers(workers: int):
+    """
+    Set the number of threads (and worker processes) of the internal executors used by
+    the async API.
+
+    Work already submitted finishes on the previous executors.
+
+    Args:
+        workers: Maximum number of parses running at the same time
+    """
+    global _executor, _process_executor, _workers
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+    with _executor_lock:
+        old = (_executor, _process_executor)
+        _executor, _process_executor, _workers = None, None, workers
+    for executor in old:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+async def run(func, *args) -> Any:
+    """
+    Run func(*args) on the internal executor and await the result.
+
+    Args:
+        func: Blocking callable, typically a parse call
+        args: Arguments of func
+    """
+    return await asyncio.wrap_future(_get_executor().submit(func, *args))
+
+
+async def aparse(sql, kind: str = "sql", pure: bool = False, executor: str = "thread") -> Any:
+    """
+    Parse SQL off the event loop thread.
+
+    Args:
+        sql: SQL text, str or UTF-8 buffer
+        kind: Statement kind, see pysqlparse.batch.parse_statement (default "sql")
+        pure: Parse SQL without note
+        executor: "thread" to parse on the internal thread pool, "process" to parse in a
+                  worker process, which keeps the loop responsive even if the native
+                  parser holds the GIL; "process" does not support kind "sql"
+
+    Returns:
+        The parsed wrapper object, e.g. Sql for kind "sql" or Query for kind "query"
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"unknown executor: {executor!r}, expected one of {EXECUTORS}")
+    if executor == "thread":
+        return await run(parse_statement, sql, kind, pure)
+    if kind == "sql":
+        raise ValueError("kind 'sql' cannot be parsed on a process pool")
+    if not isinstance(sql, str):
+        sql = bytes(sql)
+    data = await asyncio.wrap_future(_get_process_executor().submit(parse_serialized, sql, kind, pure))
+    return serial.restore(data)
+
+
+async def aiterate(iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    """
+    Drive a blocking iterator on the internal executor, one item per step.
+
+    The iterator is closed when the async iteration ends, is broken off or cancelled;
+    if a step is still running at that point, it is closed right after that step.
+
+    Args:
+        iterator: Blocking iterator, e.g. Sql.iter_statements(...)
+    """
+    done = object()
+    future = None
+    try:
+        while True:
+            future = _get_executor().submit(next, iterator, done)
+            item = await asyncio.wrap_future(future)
+            if item is done:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            if future is not None and not future.done():
+                future.add_done_callback(lambda _: close())
+            else:
+                close()
@@ -0,0 +1,134 @@
+"""
+Batch parsing of many SQL statements on a thread or process pool.
+
+Threads only parse in parallel if the native parser releases the GIL during a parse.
+The extension does not document that it does, and nothing in this package depends on
+it; where it holds the GIL, the threads take turns and only the process pool gives a
+speedup. Worker processes send the parsed statements back in their to_bytes() form.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pysqlparse import serial
+from pysqlparse.interning import InternTable
+from pysqlparse.sql import Sql
+from pysqlparse.statement import Cte, Delete, Insert, Query, TableDDL, Update, View
+
+
+STATEMENT_KINDS: Dict[str, Callable[[str, bool], Any]] = {
+    "query": lambda statement, pure: Query(statement, "", pure),
+    "insert": lambda statement, pure: Insert(statement, pure),
+    "view": lambda statement, pure: View(statement, pure),
+    "cte": lambda statement, pure: Cte(statement, pure),
+    "update": lambda statement, pure: Update(statement),
+    "delete": lambda statement, pure: Delete(statement),
+    "create": lambda statement, pure: TableDDL(statement),
+    "sql": lambda statement, pure: Sql(sql_statements=statement, pure=pure),
+}
+
+EXECUTORS = ("thread", "process")
+
+
+def parse_statement(statement: str, kind: str = "query", pure: bool = False) -> Any:
+    """
+    Parse a single statement into the wrapper class of the given kind.
+
+    Args:
+        statement: SQL statement to parse
+        kind: One of the keys of STATEMENT_KINDS ("query", "insert", "view", "cte",
+              "update", "delete", "create" or "sql")
+        pure: Parse SQL without note (ignored by kinds that do not support it)
+
+    Returns:
+        The parsed wrapper object, e.g. Query for kind "query"
+    """
+    try:
+        factory = STATEMENT_KINDS[kind]
+    except KeyError:
+        raise ValueError(f"unknown statement kind: {kind!r}") from None
+    return factory(statement, pure)
+
+
+def parse_serialized(statement: str, kind: str = "query", pure: bool = False) -> bytes:
+    """
+    Parse a single statement and return the to_bytes() form of the wrapper object,
+    for parsing in another process. Restore it with pysqlparse.serial.restore.
+    """
+    return parse_statement(statement, kind, pure).to_bytes()
+
+
+def _parse_chunk_serialized(chunk: List[str], kind: str, pure: bool) -> List[bytes]:
+    return [parse_serialized(s, kind, pure) for s in chunk]
+
+
+def parse_many(
+        statements: Sequence[str],
+        kind: str = "query",
+        workers: int = None,
+        pure: bool = False,
+        strings: Optional[InternTable] = None,
+        executor: str = "thread"
+) -> List[Any]:
+    """
+    Parse a list of statements of the same kind on a thread or process pool.
+
+    The input is split into contiguous chunks, one task per chunk, and the results are
+    returned in input order. Threads share the parsed objects without copying, but only
+    run in parallel if the native parser releases the GIL (see the module docstring).
+    Processes always run in parallel; every statement is then serialized with
+    to_bytes() in the worker and restored without parsing, and ast, format and tokens
+    parse it again on first call.
+
+    Args:
+        statements: SQL statements to parse
+        kind: Statement kind, see parse_statement
+        workers: Number of worker threads or processes (default: os.cpu_count())
+        pure: Parse SQL without note
+        strings: Intern table shared by all parsed objects, so equal names in their
+                 attributes are stored once (default: none, or the global table)
+        executor: "thread" or "process"; "process" does not support kind "sql", whose
+                  serialized form holds only the input
+
+    Returns:
+        List of parsed wrapper objects in the same order as statements
+    """
+    if kind not in STATEMENT_KINDS:
+        raise ValueError(f"unknown statement kind: {kind!r}")
+    if executor not in EXECUTORS:
+        raise ValueError(f"unknown executor: {executor!r}, expected one of {EXECUTORS}")
+    if executor == "process" and kind == "sql":
+        raise ValueError("kind 'sql' cannot be parsed on a process pool")
+    statements = list(statements)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(statements) <= 1:
+        return _share([parse_statement(s, kind, pure) for s in statements], strings)
+
+    chunk_size = max(1, -(-len(statements) // (workers * 4)))
+    chunks = [statements[i:i + chunk_size] for i in range(0, len(statements), chunk_size)]
+
+    result = []
+    if executor == "process":
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_parse_chunk_serialized, chunk, kind, pure) for chunk in chunks]
+            for future in futures:
+                result.extend(serial.restore(data) for data in future.result())
+        return _share(result, strings)
+
+    def parse_chunk(chunk):
+        return [parse_statement(s, kind, pure) for s in chunk]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for parsed in pool.map(parse_chunk, chunks):
+            result.extend(parsed)
+    return _share(result, strings)
+
+
+def _share(parsed: List[Any], strings: Optional[InternTable]) -> List[Any]:
+    if strings is not None:
+        for obj in parsed:
+            if isinstance(obj, Sql):
+                obj.strings = strings
+            else:
+                obj._strings = strings
+    return parsed
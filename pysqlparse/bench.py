@@ -0,0 +1,378 @@
+"""
+Benchmark suite with a deterministic synthetic SQL corpus.
+
+Usage:
+    python -m pysqlparse.bench [--scale N] [--seed S] [--repeat R] [--output FILE]
+    python -m pysqlparse.bench --compare BASE.json NEW.json
+
+Every benchmark runs in a fresh interpreter and reports throughput in MB/s and
+statements/s plus the peak RSS of that interpreter and its growth during the timed
+runs, as JSON, so results of two versions can be compared. The import benchmarks
+report the time to import the package in a fresh interpreter.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import pysqlparse
+from pysqlparse.sql import Sql
+from pysqlparse.statement import Cte, Delete, Insert, Query, TableDDL, Update, View
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+_TYPES = ("INT", "BIGINT", "VARCHAR(255)", "DECIMAL(18, 4)", "DATE", "TIMESTAMP", "TEXT", "TINYINT(1)")
+
+
+class CorpusGenerator(object):
+    """
+    Deterministic generator of synthetic SQL statements of every supported type.
+
+    Args:
+        seed: Random seed, the same seed and scale always give the same corpus
+        scale: Size multiplier for nesting depth, row and column counts
+    """
+
+    def __init__(self, seed: int = 0, scale: int = 1):
+        self.random = random.Random(seed)
+        self.scale = max(1, scale)
+
+    def _ident(self, prefix: str) -> str:
+        return f"{prefix}{self.random.randrange(1000)}"
+
+    def _literal(self) -> str:
+        r = self.random.random()
+        if r < 0.4:
+            return str(self.random.randrange(100000))
+        if r < 0.6:
+            return f"{self.random.uniform(0, 1000):.3f}"
+        if r < 0.9:
+            return f"'v{self.random.randrange(100000)}'"
+        return "NULL"
+
+    def _condition(self, alias: str) -> str:
+        parts = []
+        for _ in range(self.random.randint(1, 3)):
+            col = f"{alias}.{self._ident('c')}"
+            kind = self.random.randrange(4)
+            if kind == 0:
+                parts.append(f"{col} = {self._literal()}")
+            elif kind == 1:
+                parts.append(f"{col} IN ({', '.join(self._literal() for _ in range(self.random.randint(2, 8)))})")
+            elif kind == 2:
+                parts.append(f"{col} BETWEEN {self.random.randrange(100)} AND {self.random.randrange(100, 1000)}")
+            else:
+                parts.append(f"{col} LIKE '%{self.random.randrange(100)}%'")
+        return " AND ".join(parts)
+
+    def query(self, depth: int = None) -> str:
+        """SELECT with nested subqueries, joins, aggregation, sorting and limit."""
+        depth = self.random.randint(1, 4 * self.scale) if depth is None else depth
+        alias = f"t{depth}"
+        columns = ", ".join(f"{alias}.{self._ident('c')}" for _ in range(self.random.randint(2, 6)))
+        if depth <= 1:
+            source = f"{self._ident('db')}.{self._ident('tbl')} {alias}"
+        else:
+            source = f"({self.query(depth - 1)}) {alias}"
+        join = ""
+        if self.random.random() < 0.5:
+            other = self._ident("j")
+            join = f" LEFT JOIN {self._ident('dim')} {other} ON {alias}.id = {other}.id"
+        sql = f"SELECT {columns}, COUNT(*) AS cnt FROM {source}{join} WHERE {self._condition(alias)}"
+        sql += f" GROUP BY {alias}.{self._ident('c')} ORDER BY cnt DESC LIMIT {self.random.randint(1, 1000)}"
+        return sql
+
+    def insert(self) -> str:
+        """Wide multi-row INSERT ... VALUES."""
+        n_columns = self.random.randint(4, 8 * self.scale)
+        columns = ", ".join(f"c{i}" for i in range(n_columns))
+        rows = ",\n".join(
+            f"({', '.join(self._literal() for _ in range(n_columns))})"
+            for _ in range(self.random.randint(10, 100 * self.scale))
+        )
+        return f"INSERT INTO {self._ident('tbl')} ({columns}) VALUES\n{rows}"
+
+    def insert_select(self) -> str:
+        """INSERT ... SELECT."""
+        return f"INSERT INTO {self._ident('tbl')} {self.query()}"
+
+    def cte(self) -> str:
+        """Long chain of CTEs, each reading the previous one."""
+        n = self.random.randint(2, 10 * self.scale)
+        ctes = [f"c0 AS ({self.query(1)})"]
+        for i in range(1, n):
+            ctes.append(f"c{i} AS (SELECT * FROM c{i - 1} WHERE {self._condition(f'c{i - 1}')})")
+        return f"WITH {', '.join(ctes)} SELECT * FROM c{n - 1}"
+
+    def create(self) -> str:
+        """Big CREATE TABLE with constraints and comments."""
+        n_columns = self.random.randint(10, 50 * self.scale)
+        columns = [
+            f"  c{i} {self.random.choice(_TYPES)} {'NOT NULL' if self.random.random() < 0.5 else 'NULL'}"
+            f" DEFAULT {self._literal()} COMMENT 'column {i}'"
+            for i in range(n_columns)
+        ]
+        columns.insert(0, "  id BIGINT NOT NULL AUTO_INCREMENT COMMENT 'primary key'")
+        columns.append("  PRIMARY KEY (id)")
+        return f"CREATE TABLE {self._ident('tbl')} (\n" + ",\n".join(columns) + "\n) COMMENT='generated table'"
+
+    def view(self) -> str:
+        """CREATE VIEW over a generated query."""
+        return f"CREATE VIEW {self._ident('v')} AS {self.query()}"
+
+    def update(self) -> str:
+        """UPDATE with several assignments."""
+        sets = ", ".join(f"c{i} = {self._literal()}" for i in range(self.random.randint(1, 8)))
+        return f"UPDATE {self._ident('tbl')} t SET {sets} WHERE {self._condition('t')}"
+
+    def delete(self) -> str:
+        """DELETE with a condition."""
+        table = self._ident("tbl")
+        return f"DELETE FROM {table} WHERE {self._condition(table)}"
+
+    def corpus(self, count: int = 20) -> Dict[str, List[str]]:
+        """
+        Generate count statements of every type.
+
+        Returns:
+            Dict mapping statement kind ("query", "insert", "cte", "create", "view",
+            "update", "delete") to its statements; "insert" mixes VALUES and SELECT inserts.
+        """
+        return {
+            "query": [self.query() for _ in range(count)],
+            "insert": [self.insert() if i % 2 else self.insert_select() for i in range(count)],
+            "cte": [self.cte() for _ in range(count)],
+            "create": [self.create() for _ in range(count)],
+            "view": [self.view() for _ in range(count)],
+            "update": [self.update() for _ in range(count)],
+            "delete": [self.delete() for _ in range(count)],
+        }
+
+
+def peak_rss_kb():
+    """Return the peak resident set size of the process in KiB, None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(func: Callable[[str], object], inputs: List[str], repeat: int = 3,
+            statements: int = None) -> Dict[str, float]:
+    """
+    Time func over all inputs, keeping the best of repeat runs.
+
+    Args:
+        func: Function called with every input
+        inputs: Input texts
+        repeat: Number of runs
+        statements: Number of SQL statements in the inputs (default: one per input)
+
+    Returns:
+        Dict with inputs, statements, bytes, seconds, mb_per_s, statements_per_s,
+        peak_rss_kb and rss_growth_kb. The RSS values are those of the whole process;
+        run the benchmark in a fresh interpreter (see run_isolated) to attribute them
+        to it.
+    """
+    statements = len(inputs) if statements is None else statements
+    total = sum(len(s.encode("utf-8")) for s in inputs)
+    rss_before = peak_rss_kb()
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        for s in inputs:
+            func(s)
+        best = min(best, time.perf_counter() - start)
+    best = max(best, 1e-9)
+    rss_after = peak_rss_kb()
+    return {
+        "inputs": len(inputs),
+        "statements": statements,
+        "bytes": total,
+        "seconds": best,
+        "mb_per_s": total / best / 1e6,
+        "statements_per_s": statements / best,
+        "peak_rss_kb": rss_after,
+        "rss_growth_kb": rss_after - rss_before if rss_after is not None else None,
+    }
+
+
+def benchmarks(corpus: Dict[str, List[str]]) -> Dict[str, tuple]:
+    """
+    Return the benchmark table: name -> (callable, inputs, number of statements in inputs).
+    """
+    everything = [s for statements in corpus.values() for s in statements]
+    script = [";\n".join(everything)]
+    table = {
+        "tokenize.query": (Query.tokenize, corpus["query"]),
+        "tokenize.insert": (Insert.tokenize, corpus["insert"]),
+        "tokenize.cte": (Cte.tokenize, corpus["cte"]),
+        "tokenize.view": (View.tokenize, corpus["view"]),
+        "tokenize.update": (Update.tokenize, corpus["update"]),
+        "tokenize.delete": (Delete.tokenize, corpus["delete"]),
+        "parse.query": (lambda s: Query(s, ""), corpus["query"]),
+        "parse.insert": (Insert, corpus["insert"]),
+        "parse.cte": (Cte, corpus["cte"]),
+        "parse.create": (TableDDL, corpus["create"]),
+        "parse.view": (View, corpus["view"]),
+        "parse.update": (Update, corpus["update"]),
+        "parse.delete": (Delete, corpus["delete"]),
+        "format": (pysqlparse.format, everything),
+        "strip_note": (pysqlparse.strip_note, everything),
+    }
+    table = {name: (func, inputs, len(inputs)) for name, (func, inputs) in table.items()}
+    # The script benchmarks parse one script holding every statement of the corpus.
+    table["sql"] = (Sql, script, len(everything))
+    table["sql.format"] = (lambda s: Sql(s).format(), script, len(everything))
+    table["sql.ast"] = (lambda s: Sql(s).AST(), script, len(everything))
+    return table
+
+
+def run_one(name: str, seed: int = 0, scale: int = 1, count: int = 20, repeat: int = 3) -> Dict[str, float]:
+    """
+    Generate the corpus and run one benchmark in this process, see measure().
+    """
+    corpus = CorpusGenerator(seed, scale).corpus(count)
+    func, inputs, statements = benchmarks(corpus)[name]
+    return measure(func, inputs, repeat, statements)
+
+
+def run_isolated(name: str, seed: int = 0, scale: int = 1, count: int = 20, repeat: int = 3) -> Dict[str, float]:
+    """
+    Run one benchmark in a fresh interpreter, so its peak RSS is not that of the
+    benchmarks run before it.
+
+    Returns:
+        The result of run_one() in the child interpreter
+    """
+    code = (f"import json; from pysqlparse.bench import run_one; "
+            f"print(json.dumps(run_one({name!r}, {seed!r}, {scale!r}, {count!r}, {repeat!r})))")
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+IMPORT_BENCHMARKS = {
+    "import": "import pysqlparse",
+    "import.strip_note": "from pysqlparse import strip_note",
+    "import.sql": "from pysqlparse import Sql",
+}
+
+
+def import_time(statement: str = "import pysqlparse", repeat: int = 3) -> float:
+    """
+    Time an import statement in a fresh interpreter, keeping the best of repeat runs.
+
+    Returns:
+        Seconds spent in the statement
+    """
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+        best = min(best, float(out))
+    return best
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+        return version("pysqlparse")
+    except Exception:
+        return None
+
+
+def run(seed: int = 0, scale: int = 1, count: int = 20, repeat: int = 3, only: List[str] = None) -> Dict:
+    """
+    Generate the corpus and run every benchmark in a fresh interpreter.
+
+    Args:
+        seed: Corpus random seed
+        scale: Corpus size multiplier
+        count: Statements generated per statement type
+        repeat: Runs per benchmark, the fastest one is reported
+        only: Names of the benchmarks to run (default: all)
+
+    Returns:
+        JSON-serializable dict with environment information and per-benchmark results
+    """
+    names = list(benchmarks(CorpusGenerator(seed, 1).corpus(1)))
+    results = {name: run_isolated(name, seed, scale, count, repeat) for name in names
+               if not only or name in only}
+    imports = {name: import_time(statement, repeat) for name, statement in IMPORT_BENCHMARKS.items()
+               if not only or name in only}
+    return {
+        "version": _version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "scale": scale,
+        "count": count,
+        "results": results,
+        "import_seconds": imports,
+    }
+
+
+def compare(base: Dict, new: Dict) -> Dict[str, Dict[str, float]]:
+    """
+    Compare two run() results.
+
+    Returns:
+        Dict mapping every benchmark present in both to its MB/s in base and new and
+        the speedup ratio new/base; import benchmarks report seconds and base/new instead
+    """
+    out = {}
+    for name, b in base["results"].items():
+        n = new["results"].get(name)
+        if n is None:
+            continue
+        out[name] = {
+            "base_mb_per_s": b["mb_per_s"],
+            "new_mb_per_s": n["mb_per_s"],
+            "speedup": n["mb_per_s"] / b["mb_per_s"] if b["mb_per_s"] else None,
+        }
+    new_imports = new.get("import_seconds", {})
+    for name, b in base.get("import_seconds", {}).items():
+        n = new_imports.get(name)
+        if n is None:
+            continue
+        out[name] = {"base_seconds": b, "new_seconds": n, "speedup": b / n if n else None}
+    return out
+
+
+def main(argv: List[str] = None):
+    arg_parser = argparse.ArgumentParser(prog="python -m pysqlparse.bench", description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--scale", type=int, default=1)
+    arg_parser.add_argument("--count", type=int, default=20, help="statements per statement type")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    arg_parser.add_argument("--output", help="write the JSON result to this file")
+    arg_parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    args = arg_parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as fp:
+            base = json.load(fp)
+        with open(args.compare[1], encoding="utf-8") as fp:
+            new = json.load(fp)
+        result = compare(base, new)
+    else:
+        result = run(args.seed, args.scale, args.count, args.repeat, args.only)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
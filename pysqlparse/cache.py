@@ -0,0 +1,408 @@
+"""
+Opt-in caches of parse results.
+
+ParseCache is an in-memory LRU cache: when enabled, the statement wrappers and
+Query.parse_dependence look up the parsed native object by statement text (dependencies
+optionally by a literal-normalized form of it) and skip the native parse call on a hit.
+
+DiskCache persists serialized parse results in a directory shared by several
+processes, keyed by a hash of the statement text, so unchanged statements are not
+parsed again across runs.
+"""
+import functools
+import hashlib
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Any, Callable, Optional, Tuple
+
+from pysqlparse import profiler
+from pysqlparse import serial
+from pysqlparse.lexer import shape
+
+CacheInfo = namedtuple("CacheInfo", ("hits", "misses", "evictions", "entries", "bytes", "max_entries", "max_bytes"))
+
+CACHE_KEYS = ("text", "fingerprint")
+
+
+class ParseCache(object):
+    """
+    Thread-safe LRU cache of parse results.
+
+    Args:
+        max_entries: Maximum number of cached results
+        max_bytes: Maximum total UTF-8 encoded size of the cached statement texts
+                   (None: unbounded)
+        key: "text" to key every result on the exact statement text. "fingerprint" to key
+             results that do not depend on literals (the dependencies of
+             Query.parse_dependence) on the statement with its literals, comments and
+             whitespace normalized (pysqlparse.lexer.shape), so statements differing only
+             in literals share them. Parsed statements are always keyed on the exact
+             text, so the raw text and fields of a wrapper are those of its own statement.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: Optional[int] = None, key: str = "text"):
+        if key not in CACHE_KEYS:
+            raise ValueError(f"unknown cache key: {key!r}, expected one of {CACHE_KEYS}")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.key = key
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, func: Callable, statement: str, *args, by_shape: bool = False) -> Any:
+        """
+        Return func(statement, *args), from the cache when possible.
+
+        Args:
+            func: Native parse function, e.g. pysqlparser.query
+            statement: SQL statement text
+            args: Remaining arguments of func
+            by_shape: The result does not depend on literals and may be shared between
+                      statements of the same shape if the cache key is "fingerprint"
+        """
+        text = shape(statement) if by_shape and self.key == "fingerprint" else statement
+        key = (func, text, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        result = func(statement, *args)
+        # ASCII text, the common case, encodes to one byte per character.
+        size = len(text) if text.isascii() else len(text.encode("utf-8", "surrogatepass"))
+        if self.max_bytes is not None and size > self.max_bytes:
+            return result
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (result, size)
+                self._bytes += size
+                self._evict()
+        return result
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all cached results and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Return the cache counters and current size."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self._entries),
+                             self._bytes, self.max_entries, self.max_bytes)
+
+
+class DiskCache(object):
+    """
+    Persistent parse cache in a directory, safe to share between processes.
+
+    Entries are keyed by a hash of the statement text, the result kind, the parse
+    arguments and the environment the result was produced in (see environment()), and hold the to_bytes() form of the parsed statement (or the value of a
+    derived result such as dependencies or formatted text). A hit costs one hash and
+    one file read. Entries are written to a temporary file and renamed into place, so
+    readers never see partial data; when the directory grows past max_bytes, the least
+    recently used entries are removed.
+
+    Pass the cache to the statement wrappers, Query.parse_dependence or Sql with
+    ``cache=``. Errors of the cache directory are never raised to the caller, the
+    statement is parsed instead.
+
+    Args:
+        path: Cache directory, created if missing
+        max_bytes: Maximum total size of the cache files (None: unbounded)
+    """
+
+    _suffix = ".psqp"
+
+    def __init__(self, path, max_bytes: Optional[int] = 1 << 30):
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.path = os.path.abspath(os.fspath(path))
+        self.max_bytes = max_bytes
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(statement: str) -> bytes:
+        """Return the content hash of a statement text, see get() and put()."""
+        return hashlib.blake2b(statement.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def _file(self, digest: bytes, kind: str, args: Tuple) -> str:
+        key = hashlib.blake2b(digest, digest_size=16)
+        key.update(f"{environment()}:{kind}:{args!r}".encode("utf-8"))
+        name = key.hexdigest()
+        return os.path.join(self.path, name[:2], name[2:] + self._suffix)
+
+    def get(self, digest: bytes, kind: str, args: Tuple = ()) -> Optional[bytes]:
+        """
+        Read a cached entry.
+
+        Args:
+            digest: Content hash of the statement, see digest()
+            kind: Kind of the cached result, e.g. the statement class name
+            args: Parse arguments the result depends on
+
+        Returns:
+            The cached data, None on a miss
+        """
+        file = self._file(digest, kind, args)
+        try:
+            with open(file, "rb") as fp:
+                data = fp.read()
+            os.utime(file)
+        except OSError:
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, digest: bytes, kind: str, args: Tuple, data: bytes):
+        """
+        Write a cache entry atomically, replacing any entry of the same key.
+
+        Args:
+            digest: Content hash of the statement, see digest()
+            kind: Kind of the cached result
+            args: Parse arguments the result depends on
+            data: Data to cache
+        """
+        file = self._file(digest, kind, args)
+        directory = os.path.dirname(file)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    fp.write(data)
+                os.replace(tmp, file)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            return
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += len(data)
+            if self._bytes is None or self._bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for sub in os.scandir(self.path):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(self._suffix):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        # Other processes write to the same directory, so the running total is only a
+        # lower bound; scan to get the real size and drop down to 90% of max_bytes.
+        entries = list(self._entries())
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            limit = self.max_bytes * 9 // 10
+            for file, size, _ in sorted(entries, key=lambda e: e[2]):
+                try:
+                    os.unlink(file)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+                if total <= limit:
+                    break
+        self._bytes = total
+
+    def restore(self, statement: Any, digest: bytes, args: Tuple = ()) -> bool:
+        """
+        Fill a statement wrapper from its cached parse result.
+
+        Returns:
+            True on a hit; on a miss the wrapper is left untouched
+        """
+        data = self.get(digest, statement.__class__.__name__, args)
+        if data is None:
+            return False
+        try:
+            cls_name, fields = serial.loads(data)
+        except serial.SerializationError:
+            return False
+        if cls_name != statement.__class__.__name__:
+            return False
+        statement._restore_fields(fields)
+        return True
+
+    def store(self, statement: Any, digest: bytes, args: Tuple = ()):
+        """Cache the parse result of a statement wrapper."""
+        try:
+            data = statement.to_bytes()
+        except serial.SerializationError:
+            return
+        self.put(digest, statement.__class__.__name__, args, data)
+
+    def get_value(self, digest: bytes, kind: str, args: Tuple = (), default: Any = None) -> Any:
+        """Return a cached derived result (dependencies, formatted text, ...), or default on a miss."""
+        data = self.get(digest, kind, args)
+        if data is None:
+            return default
+        try:
+            return serial.loads(data)[1]["value"]
+        except (serial.SerializationError, KeyError):
+            return default
+
+    def put_value(self, digest: bytes, kind: str, args: Tuple, value: Any):
+        """Cache a derived result; values that cannot be serialized are skipped."""
+        try:
+            data = serial.dumps(kind, {"value": value})
+        except serial.SerializationError:
+            return
+        self.put(digest, kind, args, data)
+
+    def clear(self):
+        """Remove all cache files and reset the counters."""
+        with self._lock:
+            for file, _, _ in list(self._entries()):
+                try:
+                    os.unlink(file)
+                except OSError:
+                    pass
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Return the cache counters and the current size of the cache directory."""
+        entries = list(self._entries())
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(entries),
+                             sum(size for _, size, _ in entries), None, self.max_bytes)
+
+
+@functools.lru_cache(maxsize=None)
+def environment() -> str:
+    """
+    Return the part of the DiskCache keys that identifies the producer of a result: the
+    serialization format version, the pysqlparse version, the Python version and the
+    size and modification time of the native extension file. Entries written by another
+    version of the package or parser are therefore never read.
+    """
+    try:
+        from importlib.metadata import version
+        package = version("pysqlparse")
+    except Exception:
+        package = None
+    native = None
+    try:
+        spec = importlib.util.find_spec("pysqlparse.pysqlparser")
+        if spec is not None and spec.origin:
+            stat = os.stat(spec.origin)
+            native = (stat.st_size, stat.st_mtime_ns)
+    except (ImportError, OSError, ValueError):
+        pass
+    return f"{serial.FORMAT_VERSION}:{package}:{sys.version_info[0]}.{sys.version_info[1]}:{native}"
+
+
+_missing = object()
+
+
+def cached_value(cache: Optional[DiskCache], kind: str, statement: str, args: Tuple, func: Callable) -> Any:
+    """
+    Return func(), from the disk cache when one is given and holds the result.
+
+    Args:
+        cache: DiskCache or None
+        kind: Kind of the result, part of the cache key
+        statement: Statement text the result is derived from
+        args: Arguments the result depends on
+        func: Function computing the result on a miss
+    """
+    if cache is None:
+        return func()
+    digest = cache.digest(statement)
+    value = cache.get_value(digest, kind, args, _missing)
+    if value is _missing:
+        value = func()
+        cache.put_value(digest, kind, args, value)
+    return value
+
+
+_cache: Optional[ParseCache] = None
+
+
+def enable_cache(max_entries: int = 4096, max_bytes: Optional[int] = None, key: str = "text") -> ParseCache:
+    """
+    Enable the global parse cache, replacing any cache enabled before.
+
+    Args:
+        max_entries: Maximum number of cached results
+        max_bytes: Maximum total UTF-8 encoded size of the cached statement texts
+                   (None: unbounded)
+        key: "text" or "fingerprint", see ParseCache
+
+    Returns:
+        The enabled cache
+    """
+    global _cache
+    _cache = ParseCache(max_entries, max_bytes, key)
+    return _cache
+
+
+def disable_cache():
+    """Disable and drop the global parse cache."""
+    global _cache
+    _cache = None
+
+
+def cache_info() -> Optional[CacheInfo]:
+    """Return the counters of the global parse cache, or None if it is disabled."""
+    cache = _cache
+    return cache.info() if cache is not None else None
+
+
+def cached_parse(func: Callable, statement: str, *args, by_shape: bool = False) -> Any:
+    """
+    Call a native parse function through the global parse cache, if enabled.
+    The call is reported to the profiler as the "parse" phase.
+
+    Args:
+        func: Native parse function, e.g. pysqlparser.query
+        statement: SQL statement text
+        args: Remaining arguments of func
+        by_shape: The result does not depend on literals, see ParseCache.parse
+    """
+    cache = _cache
+    parse = func if cache is None else functools.partial(cache.parse, func, by_shape=by_shape)
+    if not profiler.enabled():
+        return parse(statement, *args)
+    return profiler.call("parse", func.__name__, parse, statement, *args, source=statement)
@@ -3,3 +3,9 @@ import os
 __CURRENT_PATH__ = os.path.dirname(os.path.abspath(__file__))
 
 DEFAULT_FORMAT_INDENT = 4
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+DEFAULT_ASYNC_WORKERS = 4
+
+DEFAULT_LIMITED_WORKERS = 4
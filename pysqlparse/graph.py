@@ -0,0 +1,250 @@
+"""
+Table dependency graph built from view, CTE, query and INSERT ... SELECT definitions.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pysqlparse import lexer
+from pysqlparse.statement import Cte, Insert, Query, View
+
+
+GRAPH_KINDS = ("view", "insert", "cte", "query")
+
+
+def detect_kind(sql: str) -> str:
+    """
+    Guess the definition kind of a statement from its leading keywords.
+
+    Returns:
+        "view" for CREATE [OR REPLACE] ... VIEW, "insert" for INSERT, "cte" for WITH,
+        otherwise "query"
+    """
+    kind = lexer.statement_kind(sql)
+    return kind if kind in ("view", "insert", "cte") else "query"
+
+
+def parse_definition(sql: str, kind: Optional[str] = None) -> Tuple[Optional[str], List[str]]:
+    """
+    Parse one definition and return its target name and upstream tables.
+
+    Args:
+        sql: CREATE VIEW, INSERT ... SELECT, WITH ... or SELECT statement
+        kind: One of GRAPH_KINDS, detected from the statement when None
+
+    Returns:
+        (name, dependencies): the view or insert target name (None for queries and CTEs)
+        and the tables the statement reads from
+    """
+    kind = kind or detect_kind(sql)
+    if kind == "view":
+        view = View(sql)
+        return view.name, Query.parse_dependence(view.query)
+    if kind == "insert":
+        insert = Insert(sql)
+        if not insert.query_stmt:
+            return insert.name, []
+        statement = f"{insert.cte_stmt} {insert.query_stmt}" if insert.cte_stmt else insert.query_stmt
+        return insert.name, Query.parse_dependence(statement)
+    if kind == "cte":
+        return None, Cte(sql, level="dependencies").dependencies
+    if kind == "query":
+        return None, Query.parse_dependence(sql)
+    raise ValueError(f"unknown definition kind: {kind!r}, expected one of {GRAPH_KINDS}")
+
+
+class DependencyGraph(object):
+    """
+    Incrementally maintained graph of table dependencies.
+
+    Every definition (a view, an INSERT ... SELECT, a CTE or a plain query) is a node
+    pointing at the tables it reads from. Forward and reverse adjacency indexes are kept
+    up to date, so upstream/downstream lookups never re-parse anything, and update()
+    only re-parses the changed definition. Several INSERT ... SELECT statements into the
+    same target all feed it, so their dependencies are unioned; any other definition
+    replaces what the node had.
+
+    Args:
+        normalize: Optional function applied to every table name, e.g. str.lower
+                   for case-insensitive warehouses
+    """
+
+    def __init__(self, normalize: Optional[Callable[[str], str]] = None):
+        self._normalize = normalize
+        # name -> {statement: dependencies}, several statements only for INSERT targets
+        self._sql: Dict[str, Dict[str, Set[str]]] = {}
+        self._inserts: Set[str] = set()
+        self._upstream: Dict[str, Set[str]] = {}
+        self._downstream: Dict[str, Set[str]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return self._key(name) in self._upstream or self._key(name) in self._downstream
+
+    def __len__(self) -> int:
+        return len(self.nodes())
+
+    def _key(self, name: str) -> str:
+        return self._normalize(name) if self._normalize else name
+
+    def _resolve_name(self, name: Optional[str], parsed_name: Optional[str]) -> str:
+        name = name or parsed_name
+        if not name:
+            raise ValueError("a name is required for query and CTE definitions")
+        return self._key(name)
+
+    def add(self, name: Optional[str], sql: str, kind: Optional[str] = None) -> str:
+        """
+        Add or replace a definition; an INSERT ... SELECT into a target that is only
+        defined by inserts so far adds to its dependencies instead of replacing them.
+
+        Args:
+            name: Node name; for views and inserts None means the parsed target name
+            sql: Definition statement
+            kind: One of GRAPH_KINDS, detected from the statement when None
+
+        Returns:
+            The node name
+        """
+        kind = kind or detect_kind(sql)
+        parsed_name, dependencies = parse_definition(sql, kind)
+        name = self._resolve_name(name, parsed_name)
+        self._set(name, sql, kind, dependencies)
+        return name
+
+    def update(self, name: str, sql: str, kind: Optional[str] = None) -> bool:
+        """
+        Replace the definition of name, re-parsing only that statement. Every INSERT
+        ... SELECT added for name before is replaced as well.
+
+        Args:
+            name: Node name
+            sql: New definition statement
+            kind: One of GRAPH_KINDS, detected from the statement when None
+
+        Returns:
+            True if the dependencies of name changed
+        """
+        key = self._key(name)
+        if list(self._sql.get(key, ())) == [sql]:
+            return False
+        before = set(self._upstream.get(key, ()))
+        self.remove(key)
+        self.add(key, sql, kind)
+        return self._upstream.get(key, set()) != before
+
+    def add_many(self, definitions: Iterable[Tuple[Optional[str], str]], kind: Optional[str] = None,
+                 workers: Optional[int] = None) -> List[str]:
+        """
+        Add many definitions, parsing them on a thread pool.
+
+        Args:
+            definitions: Iterable of (name, sql) pairs, see add()
+            kind: Kind of all definitions, detected per statement when None
+            workers: Number of parsing threads (default: ThreadPoolExecutor default)
+
+        Returns:
+            The node names in input order
+        """
+        definitions = [(name, sql, kind or detect_kind(sql)) for name, sql in definitions]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(lambda d: parse_definition(d[1], d[2]), definitions))
+        names = []
+        for (name, sql, sql_kind), (parsed_name, dependencies) in zip(definitions, parsed):
+            name = self._resolve_name(name, parsed_name)
+            self._set(name, sql, sql_kind, dependencies)
+            names.append(name)
+        return names
+
+    def remove(self, name: str):
+        """Remove the definition of name; tables it read from stay as nodes if still referenced."""
+        key = self._key(name)
+        self._sql.pop(key, None)
+        self._inserts.discard(key)
+        self._unlink(key)
+
+    def _unlink(self, name: str):
+        for dependency in self._upstream.pop(name, ()):
+            dependents = self._downstream.get(dependency)
+            if dependents is not None:
+                dependents.discard(name)
+                if not dependents:
+                    del self._downstream[dependency]
+
+    def _set(self, name: str, sql: str, kind: str, dependencies: Iterable[str]):
+        if kind == "insert" and name in self._inserts:
+            self._unlink(name)
+        else:
+            self.remove(name)
+            self._sql[name] = {}
+        if kind == "insert":
+            self._inserts.add(name)
+        statements = self._sql[name]
+        statements[sql] = {self._key(d) for d in dependencies}
+        upstream = self._upstream[name] = set().union(*statements.values())
+        upstream.discard(name)
+        for dependency in upstream:
+            self._downstream.setdefault(dependency, set()).add(name)
+
+    def nodes(self) -> Set[str]:
+        """Return all definitions and all tables referenced by them."""
+        return set(self._upstream) | set(self._downstream)
+
+    def definition(self, name: str) -> Optional[str]:
+        """
+        Return the SQL definition of name, None for tables without one. Several INSERT
+        ... SELECT statements into the same target are joined with ";\n".
+        """
+        statements = self._sql.get(self._key(name))
+        return ";\n".join(statements) if statements else None
+
+    def dependencies(self, name: str) -> Set[str]:
+        """Return the tables name reads from directly."""
+        return set(self._upstream.get(self._key(name), ()))
+
+    def dependents(self, name: str) -> Set[str]:
+        """Return the definitions reading from name directly."""
+        return set(self._downstream.get(self._key(name), ()))
+
+    def _walk(self, name: str, edges: Dict[str, Set[str]]) -> Set[str]:
+        start = self._key(name)
+        seen = set()
+        queue = deque(edges.get(start, ()))
+        while queue:
+            node = queue.popleft()
+            if node in seen:
+                continue
+            seen.add(node)
+            queue.extend(edges.get(node, ()))
+        seen.discard(start)
+        return seen
+
+    def upstream(self, name: str) -> Set[str]:
+        """Return every table name depends on, directly or transitively."""
+        return self._walk(name, self._upstream)
+
+    def downstream(self, name: str) -> Set[str]:
+        """Return every definition depending on name, directly or transitively."""
+        return self._walk(name, self._downstream)
+
+    def topological_order(self) -> List[str]:
+        """
+        Return all nodes ordered so that every node comes after the tables it reads from.
+
+        Raises:
+            ValueError: If the dependencies contain a cycle
+        """
+        nodes = self.nodes()
+        pending = {node: len(self._upstream.get(node, ())) for node in nodes}
+        ready = deque(sorted(node for node, count in pending.items() if count == 0))
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for dependent in sorted(self._downstream.get(node, ())):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(nodes):
+            cycle = sorted(node for node, count in pending.items() if count > 0)
+            raise ValueError(f"dependency cycle, unresolved nodes: {', '.join(cycle)}")
+        return order
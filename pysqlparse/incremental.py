@@ -0,0 +1,154 @@
+"""
+Incremental re-splitting of an edited SQL document.
+
+A document is kept as a list of Segment objects, one per statement, in input order.
+After an edit, splitting resumes at the statement boundary before the edit and stops
+as soon as a new statement starts at the shifted position of an old statement behind
+the edit: the splitter is in its initial state after every statement-ending ';', so
+from there on the old statements are still valid and only their offsets move.
+"""
+from collections import namedtuple
+from typing import List, Optional, Tuple
+
+from pysqlparse.splitter import StatementSplitter
+
+
+EditResult = namedtuple("EditResult", ("index", "removed", "inserted"))
+EditResult.__doc__ = """\
+Statements changed by an edit: ``removed`` statements starting at ``index`` were
+replaced by ``inserted`` new ones; statements after them only moved."""
+
+_CHUNK = 1 << 16
+
+
+class Segment(object):
+    """
+    One statement of a document and the results derived from it.
+
+    ``start``/``end`` are the character offsets of ``text`` in the document; ``native``
+    and ``results`` hold the parse of the statement, kept as long as its text is unchanged.
+    """
+
+    __slots__ = ("start", "end", "text", "native", "results")
+
+    def __init__(self, start: int, end: int, text: str):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.native = None
+        self.results = {}
+
+
+def segments(text: str) -> List[Segment]:
+    """Split a document into segments."""
+    splitter = StatementSplitter()
+    out = []
+    for pos in range(0, len(text), _CHUNK):
+        out.extend(Segment(*s) for s in splitter.feed(text[pos:pos + _CHUNK]))
+    out.extend(Segment(*s) for s in splitter.close())
+    return out
+
+
+def _resume(text: str, segs: List[Segment], i: int) -> Optional[int]:
+    """Return the offset after the ';' ending segs[i - 1], None if it is unterminated."""
+    if i == 0:
+        return 0
+    end = segs[i - 1].end
+    semi = text.find(";", end)
+    # Only whitespace separates a statement from its ';'.
+    if semi < 0 or (semi > end and not text[end:semi].isspace()):
+        return None
+    return semi + 1
+
+
+def _first_ending_at_or_after(segs: List[Segment], pos: int) -> int:
+    lo, hi = 0, len(segs)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if segs[mid].end < pos:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _boundary_before(text: str, start: int) -> int:
+    """Return the offset of the ';' before a statement starting at start."""
+    p = start - 1
+    while p >= 0 and text[p].isspace():
+        p -= 1
+    return p
+
+
+def apply_edit(text: str, segs: List[Segment], start: int, end: int,
+               new_text: str) -> Tuple[str, List[Segment], EditResult]:
+    """
+    Replace text[start:end] by new_text and update the segments.
+
+    Segments behind the edit are kept and shifted; replaced segments whose text did not
+    change keep their parse results.
+
+    Args:
+        text: Document text
+        segs: Segments of text
+        start: Start offset of the replaced range
+        end: End offset of the replaced range
+        new_text: Replacement text
+
+    Returns:
+        (new document text, new segments, EditResult)
+
+    Raises:
+        ValueError: If the range is outside the document
+    """
+    if not 0 <= start <= end <= len(text):
+        raise ValueError(f"edit range {start}:{end} outside of the document (length {len(text)})")
+    delta = len(new_text) - (end - start)
+    i = _first_ending_at_or_after(segs, start)
+    while i > 0:
+        resume = _resume(text, segs, i)
+        if resume is not None and resume <= start:
+            break
+        i -= 1
+    resume = _resume(text, segs, i) if i else 0
+    document = text[:start] + new_text + text[end:]
+    edit_end = start + len(new_text)
+
+    k = i
+    while k < len(segs) and segs[k].start < end:
+        k += 1
+    fresh = []
+    splitter = StatementSplitter()
+    synced = False
+    for pos in range(resume, len(document), _CHUNK):
+        for s, e, t in splitter.feed(document[pos:pos + _CHUNK]):
+            s += resume
+            e += resume
+            while k < len(segs) and segs[k].start + delta < s:
+                k += 1
+            if k < len(segs) and segs[k].start + delta == s and _boundary_before(document, s) >= edit_end:
+                synced = True
+                break
+            fresh.append(Segment(s, e, t))
+        if synced:
+            break
+    if not synced:
+        k = len(segs)
+        fresh.extend(Segment(s + resume, e + resume, t) for s, e, t in splitter.close())
+
+    old = segs[i:k]
+    prefix = 0
+    while prefix < min(len(old), len(fresh)) and old[prefix].text == fresh[prefix].text:
+        old[prefix].start, old[prefix].end = fresh[prefix].start, fresh[prefix].end
+        fresh[prefix] = old[prefix]
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(old), len(fresh)) - prefix and old[-1 - suffix].text == fresh[-1 - suffix].text:
+        old[-1 - suffix].start, old[-1 - suffix].end = fresh[-1 - suffix].start, fresh[-1 - suffix].end
+        fresh[-1 - suffix] = old[-1 - suffix]
+        suffix += 1
+    for seg in segs[k:]:
+        seg.start += delta
+        seg.end += delta
+    result = EditResult(i + prefix, len(old) - prefix - suffix, len(fresh) - prefix - suffix)
+    return document, segs[:i] + fresh + segs[k:], result
@@ -0,0 +1,141 @@
+"""
+Shared string tables for the fields of parsed statements.
+
+The native parser creates a new str for every name it returns, so a batch of statements
+over the same tables holds every table and column name many times. An InternTable maps
+every short string to one shared object; the statement wrappers pass the fields they
+resolve through the table of their Sql object or batch, or the global table if enabled.
+"""
+import sys
+import threading
+from collections import namedtuple
+from typing import Any, Iterable, Optional
+
+InternInfo = namedtuple("InternInfo", ("strings", "requests", "hits", "saved_bytes"))
+
+MemoryReport = namedtuple("MemoryReport", ("references", "objects", "values", "bytes", "duplicate_bytes"))
+
+
+class InternTable(object):
+    """
+    Table of shared strings.
+
+    Unlike sys.intern, the strings are released together with the table, e.g. after a
+    batch.
+
+    Args:
+        max_length: Longer strings (statement texts, clauses) are not interned
+    """
+
+    def __init__(self, max_length: int = 128):
+        self.max_length = max_length
+        # dict.setdefault is atomic, so parsing threads can share a table; the counters
+        # are updated under the lock.
+        self._strings = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.saved_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def intern(self, value: Any) -> Any:
+        """
+        Return value with every string replaced by the shared string of the same value.
+
+        Lists are updated in place; tuples and dicts are rebuilt. Other values are
+        returned as they are.
+        """
+        if isinstance(value, str):
+            if len(value) > self.max_length:
+                return value
+            shared = self._strings.setdefault(value, value)
+            with self._lock:
+                self.requests += 1
+                if shared is not value:
+                    self.hits += 1
+                    self.saved_bytes += sys.getsizeof(value)
+            return shared
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                value[i] = self.intern(item)
+            return value
+        if isinstance(value, tuple):
+            return tuple(self.intern(item) for item in value)
+        if isinstance(value, dict):
+            return {self.intern(k): self.intern(v) for k, v in value.items()}
+        return value
+
+    def clear(self):
+        """Drop all strings and reset the counters."""
+        with self._lock:
+            self._strings.clear()
+            self.requests = self.hits = self.saved_bytes = 0
+
+    def info(self) -> InternInfo:
+        """
+        Return the table counters; saved_bytes is the size of the duplicate strings
+        replaced by shared ones.
+        """
+        with self._lock:
+            return InternInfo(len(self._strings), self.requests, self.hits, self.saved_bytes)
+
+
+_table: Optional[InternTable] = None
+
+
+def enable_interning(max_length: int = 128) -> InternTable:
+    """
+    Enable the global intern table, used by statements without a table of their own.
+
+    Returns:
+        The enabled table
+    """
+    global _table
+    _table = InternTable(max_length)
+    return _table
+
+
+def disable_interning():
+    """Disable and drop the global intern table."""
+    global _table
+    _table = None
+
+
+def global_table() -> Optional[InternTable]:
+    """Return the global intern table, None if interning is disabled."""
+    return _table
+
+
+def memory_report(objects: Iterable[Any]) -> MemoryReport:
+    """
+    Measure the strings held by parsed statement objects.
+
+    Args:
+        objects: Statement wrappers (or any objects with a __dict__)
+
+    Returns:
+        MemoryReport(references, objects, values, bytes, duplicate_bytes): the number of
+        string references in the resolved fields, the distinct str objects and distinct
+        values among them, the size of the distinct objects and the part of it taken by
+        duplicates that interning would remove
+    """
+    seen = {}
+    values = set()
+    references = 0
+    stack = [value for o in objects for value in vars(o).values()]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            references += 1
+            seen[id(value)] = value
+            values.add(value)
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+    size = sum(sys.getsizeof(s) for s in seen.values())
+    unique = sum(sys.getsizeof(s) for s in values)
+    return MemoryReport(references, len(seen), len(values), size, size - unique)
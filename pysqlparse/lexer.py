@@ -0,0 +1,309 @@
+"""
+Lightweight SQL lexer working on character offsets, and the literal-normalizing
+statement fingerprint built on it.
+
+The lexer only classifies tokens, it never builds token strings: every token is
+reported as ``(type, start, end)`` so callers slice the input when they need text.
+It accepts str as well as UTF-8 bytes or buffer objects, in which case the offsets
+are byte offsets.
+"""
+import hashlib
+import re
+from collections import namedtuple
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+WHITESPACE = 0
+COMMENT = 1
+KEYWORD = 2
+IDENTIFIER = 3
+QUOTED_IDENTIFIER = 4
+STRING = 5
+NUMBER = 6
+PARAMETER = 7
+OPERATOR = 8
+PUNCTUATION = 9
+OTHER = 10
+
+TOKEN_TYPES = (
+    "whitespace",
+    "comment",
+    "keyword",
+    "identifier",
+    "quoted_identifier",
+    "string",
+    "number",
+    "parameter",
+    "operator",
+    "punctuation",
+    "other",
+)
+
+KEYWORDS = frozenset((
+    "ADD", "ALL", "ALTER", "AND", "ANY", "AS", "ASC", "BEGIN", "BETWEEN", "BY", "CASCADE", "CASE",
+    "CAST", "CHECK", "COLLATE", "COLUMN", "COMMENT", "CONSTRAINT", "CREATE", "CROSS", "CURRENT",
+    "DEFAULT", "DELETE", "DESC", "DISTINCT", "DROP", "ELSE", "END", "ESCAPE", "EXCEPT", "EXISTS",
+    "FALSE", "FETCH", "FIRST", "FOLLOWING", "FOR", "FOREIGN", "FROM", "FULL", "GROUP", "HAVING",
+    "IF", "IGNORE", "ILIKE", "IN", "INDEX", "INNER", "INSERT", "INTERSECT", "INTERVAL", "INTO", "IS",
+    "JOIN", "KEY", "LAST", "LATERAL", "LEFT", "LIKE", "LIMIT", "MINUS", "NATURAL", "NOT", "NULL",
+    "NULLS", "OFFSET", "ON", "OR", "ORDER", "OUTER", "OVER", "OVERWRITE", "PARTITION", "PRECEDING",
+    "PRIMARY", "RECURSIVE", "REFERENCES", "REGEXP", "REPLACE", "RIGHT", "RLIKE", "ROLLUP", "ROW",
+    "ROWS", "SELECT", "SET", "TABLE", "TEMPORARY", "THEN", "TO", "TRUE", "UNBOUNDED", "UNION",
+    "UNIQUE", "UNKNOWN", "UPDATE", "USING", "VALUES", "VIEW", "WHEN", "WHERE", "WINDOW", "WITH",
+))
+
+_TOKEN_PATTERN = r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>[NnXxBbEe]?'[^'\\]*(?:(?:\\.|'')[^'\\]*)*(?:'|\Z))
+  | (?P<dollar>(?<![\w$])\$(?P<tag>[A-Za-z_]\w*|)\$.*?(?:\$(?P=tag)\$|\Z))
+  | (?P<qident>"[^"]*(?:""[^"]*)*(?:"|\Z)|`[^`]*(?:``[^`]*)*(?:`|\Z))
+  | (?P<number>(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)(?![\w$]))
+  | (?P<param>\?|:[A-Za-z_]\w*|@@?[A-Za-z_][\w$.]*|\$\d+|%s|%\([^)]*\)s)
+  | (?P<word>[A-Za-z_\u0080-\uffff][\w$\u0080-\uffff]*)
+  | (?P<op><=>|<>|!=|<=|>=|::|\|\||->>?|[-+*/%<>=!~^&|])
+  | (?P<punct>[(),;.\[\]{}])
+  | (?P<other>.)
+"""
+_TOKEN = re.compile(_TOKEN_PATTERN, re.X | re.S)
+# Non-ASCII bytes of UTF-8 encoded identifiers are word characters.
+_TOKEN_BYTES = re.compile(_TOKEN_PATTERN.replace("\\u0080-\\uffff", "\\x80-\\xff").encode("ascii"), re.X | re.S)
+
+_KEYWORDS_BYTES = frozenset(k.encode("ascii") for k in KEYWORDS)
+
+_GROUP_TYPES = {
+    "ws": WHITESPACE,
+    "comment": COMMENT,
+    "string": STRING,
+    "dollar": STRING,
+    "qident": QUOTED_IDENTIFIER,
+    "number": NUMBER,
+    "param": PARAMETER,
+    "op": OPERATOR,
+    "punct": PUNCTUATION,
+    "other": OTHER,
+}
+
+Token = Tuple[int, int, int]
+
+Fingerprint = namedtuple("Fingerprint", ("hash", "text"))
+
+
+def scan(statement) -> Iterator[Token]:
+    """
+    Split a statement into tokens.
+
+    Args:
+        statement: SQL text, str or UTF-8 bytes/buffer object
+
+    Returns:
+        Iterator of (type, start, end), type being one of the token type constants
+        (names in TOKEN_TYPES). Whitespace and comments are included.
+    """
+    group_types = _GROUP_TYPES
+    if isinstance(statement, str):
+        token, keywords = _TOKEN, KEYWORDS
+    else:
+        token, keywords = _TOKEN_BYTES, _KEYWORDS_BYTES
+    for m in token.finditer(statement):
+        group = m.lastgroup
+        if group == "word":
+            t = KEYWORD if m.group().upper() in keywords else IDENTIFIER
+        else:
+            t = group_types[group]
+        yield t, m.start(), m.end()
+
+
+def find_keyword(statement: str, words: Iterable[str], start: int = 0) -> Optional[Tuple[int, int]]:
+    """
+    Find the first word of words outside parentheses.
+
+    Args:
+        statement: SQL text
+        words: Upper-case words to look for
+        start: Offset to start scanning at; parentheses are counted from there
+
+    Returns:
+        (start, end) offsets of the word, None if not found
+    """
+    depth = 0
+    for t, begin, end in scan(statement[start:]):
+        if t == PUNCTUATION:
+            c = statement[start + begin]
+            if c == "(":
+                depth += 1
+            elif c == ")":
+                depth = max(0, depth - 1)
+        elif depth == 0 and (t == KEYWORD or t == IDENTIFIER) and \
+                statement[start + begin:start + end].upper() in words:
+            return start + begin, start + end
+    return None
+
+
+def statement_kind(statement: str) -> str:
+    """
+    Classify a statement by its leading keywords, without parsing it.
+
+    Returns:
+        "query" for SELECT (or a parenthesized query), "cte" for WITH, "view" for
+        CREATE [OR REPLACE] ... VIEW, "create" for other CREATE statements, "insert",
+        "update", "delete", otherwise the lower-cased first word ("" for no words)
+    """
+    words = []
+    for t, start, end in scan(statement):
+        if t == WHITESPACE or t == COMMENT:
+            continue
+        if t == PUNCTUATION and statement[start:end] == "(" and not words:
+            return "query"
+        if t != KEYWORD and t != IDENTIFIER:
+            if words:
+                break
+            continue
+        words.append(statement[start:end].upper())
+        if words[0] != "CREATE" or len(words) == 6:
+            break
+    if not words:
+        return ""
+    first = words[0]
+    if first == "SELECT":
+        return "query"
+    if first == "WITH":
+        return "cte"
+    if first == "CREATE":
+        return "view" if "VIEW" in words else "create"
+    return first.lower()
+
+
+def _closing(tokens: List[str], i: int) -> int:
+    """Return the index of the parenthesis closing tokens[i], or -1."""
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j] == "(":
+            depth += 1
+        elif tokens[j] == ")":
+            depth -= 1
+            if depth == 0:
+                return j
+    return -1
+
+
+def _collapse(tokens: List[str], values: bool = True) -> List[str]:
+    """Collapse IN (?, ?, ...) to IN (?) and, if values, multi-row VALUES to their first row."""
+    out = []
+    i = 0
+    n = len(tokens)
+    while i < n:
+        tok = tokens[i]
+        out.append(tok)
+        i += 1
+        if i >= n or tokens[i] != "(":
+            continue
+        tok = tok.upper()
+        if tok != "IN" and (tok != "VALUES" or not values):
+            continue
+        end = _closing(tokens, i)
+        if end < 0:
+            continue
+        if tok == "IN":
+            if all(t == "?" or t == "," for t in tokens[i + 1:end]):
+                out.extend(("(", "?", ")"))
+                i = end + 1
+            continue
+        out.extend(tokens[i:end + 1])
+        i = end + 1
+        while i + 1 < n and tokens[i] == "," and tokens[i + 1] == "(":
+            end = _closing(tokens, i + 1)
+            if end < 0:
+                break
+            i = end + 1
+    return out
+
+
+# Token types and keywords that end an operand, so a sign after them is a binary operator.
+_OPERAND_TYPES = frozenset((IDENTIFIER, QUOTED_IDENTIFIER, STRING, NUMBER, PARAMETER))
+_OPERAND_KEYWORDS = frozenset(("END", "NULL", "TRUE", "FALSE"))
+
+
+def _unary(tokens: List[str], types: List[int]) -> bool:
+    """Return True if the sign at the end of tokens is a unary operator."""
+    if len(tokens) < 2:
+        return True
+    prev, t = tokens[-2], types[-2]
+    if t == KEYWORD:
+        return prev.upper() not in _OPERAND_KEYWORDS
+    return not (t in _OPERAND_TYPES or prev == ")" or prev == "]")
+
+
+def _join(tokens: List[str]) -> str:
+    parts = []
+    prev = None
+    for tok in tokens:
+        if prev is not None and prev not in ("(", ".") and tok not in (",", ")", ".") and not (
+                tok == "(" and prev[0].isalpha() and prev.islower()):
+            parts.append(" ")
+        parts.append(tok)
+        prev = tok
+    return "".join(parts)
+
+
+def _normalize(statement: str, fold: bool) -> List[str]:
+    """
+    Return the tokens of a statement with literals replaced by ``?``, without whitespace,
+    comments and trailing semicolons; with fold, keywords are upper-cased and unquoted
+    identifiers lower-cased.
+    """
+    tokens = []
+    types = []
+    for t, start, end in scan(statement):
+        if t == WHITESPACE or t == COMMENT:
+            continue
+        if t == STRING or t == NUMBER or t == PARAMETER:
+            if t == NUMBER and tokens and tokens[-1] in ("-", "+") and _unary(tokens, types):
+                tokens.pop()
+                types.pop()
+            tokens.append("?")
+        elif fold and t == KEYWORD:
+            tokens.append(statement[start:end].upper())
+        elif fold and t == IDENTIFIER:
+            tokens.append(statement[start:end].lower())
+        else:
+            tokens.append(statement[start:end])
+        types.append(t)
+    while tokens and tokens[-1] == ";":
+        tokens.pop()
+    return tokens
+
+
+def shape(statement: str) -> str:
+    """
+    Return the statement with its literals normalized but its names kept as written.
+
+    As in the fingerprint text, literals and bind parameters become ``?``, ``IN (...)``
+    lists of literals collapse to ``IN (?)``, comments are dropped and whitespace is
+    normalized. Keywords and identifiers keep their case and every VALUES row is kept,
+    so statements of the same shape reference the same tables under the same names.
+    """
+    return _join(_collapse(_normalize(statement, False), values=False))
+
+
+def fingerprint(statement: str) -> Fingerprint:
+    """
+    Compute the literal-normalized fingerprint of a statement.
+
+    String, number and dollar-quoted literals as well as bind parameters become ``?``,
+    ``IN (...)`` lists of literals collapse to ``IN (?)`` and multi-row ``VALUES`` keep only
+    their first row. Comments are dropped, whitespace is normalized, keywords are
+    upper-cased and unquoted identifiers lower-cased. Statements differing only in
+    these respects get the same fingerprint.
+
+    Args:
+        statement: SQL statement
+
+    Returns:
+        Fingerprint(hash, text): a stable unsigned 64-bit hash of the normalized text,
+        and the normalized text itself
+    """
+    tokens = _normalize(statement, True)
+    text = _join(_collapse(tokens))
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return Fingerprint(int.from_bytes(digest, "little"), text)
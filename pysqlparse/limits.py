@@ -0,0 +1,262 @@
+"""
+Resource limits, deadlines and cancellation for a single parse.
+
+The input is checked against max_bytes, max_tokens and max_depth before it reaches the
+native parser, in one pass that stops as soon as a limit is exceeded. With a timeout or
+a CancelToken the parse runs on a daemon worker thread and the caller stops waiting when
+the deadline passes or the token is cancelled; the native call itself cannot be
+interrupted and finishes in the background, its result is dropped. Daemon threads are
+not joined at interpreter exit, so a hung parse does not block shutdown. A worker
+counts as busy until its parse finishes; at most set_limited_workers() workers exist at
+a time, and parses started while all of them are busy are rejected with ParseBusy
+instead of queueing up behind them.
+"""
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Optional
+
+from pysqlparse.conf import DEFAULT_LIMITED_WORKERS
+from pysqlparse.utils import as_text
+
+
+Limits = namedtuple("Limits", ("timeout_ms", "max_depth", "max_tokens", "max_bytes"), defaults=(None,) * 4)
+
+# One match per token; strings, quoted identifiers, dollar bodies and comments are
+# single tokens, so parentheses inside them are not counted.
+_TOKEN = re.compile(r"""
+    (?P<skip>\s+|--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<open>\()
+  | (?P<close>\))
+  | '[^'\\]*(?:(?:\\.|'')[^'\\]*)*(?:'|\Z)
+  | "[^"]*(?:""[^"]*)*(?:"|\Z)
+  | `[^`]*(?:``[^`]*)*(?:`|\Z)
+  | (?<![\w$])\$(?P<tag>[A-Za-z_]\w*|)\$.*?(?:\$(?P=tag)\$|\Z)
+  | [\w$]+
+  | .
+""", re.X | re.S)
+
+_CHECK_EVERY = 4096
+
+
+class ParseLimitError(Exception):
+    """Base class of the errors raised when a parse is stopped by a limit."""
+
+
+class LimitExceeded(ParseLimitError):
+    """
+    Raised when the input exceeds max_bytes, max_tokens or max_depth.
+
+    Attributes:
+        limit: Name of the exceeded limit
+        maximum: The configured maximum
+    """
+
+    def __init__(self, limit: str, maximum: int):
+        super(LimitExceeded, self).__init__(f"{limit} of {maximum} exceeded")
+        self.limit = limit
+        self.maximum = maximum
+
+
+class ParseTimeout(ParseLimitError):
+    """Raised when a parse does not finish within timeout_ms."""
+
+
+class ParseCancelled(ParseLimitError):
+    """Raised when a parse is cancelled through its CancelToken."""
+
+
+class ParseBusy(ParseLimitError):
+    """
+    Raised when a parse with a timeout or CancelToken is started while every worker
+    is still running an earlier parse, e.g. ones that timed out.
+    """
+
+
+# One slot per worker thread that may exist at a time.
+_slots = threading.BoundedSemaphore(DEFAULT_LIMITED_WORKERS)
+
+
+def set_limited_workers(workers: int):
+    """
+    Set the number of parses with a timeout or CancelToken that may run at the same
+    time, including parses still running after their caller stopped waiting.
+
+    Parses already running are not counted against the new limit.
+
+    Args:
+        workers: Maximum number of such parses
+    """
+    global _slots
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+    _slots = threading.BoundedSemaphore(workers)
+
+
+class CancelToken(object):
+    """
+    Thread-safe handle to cancel parses from another thread.
+
+    Cancelling wakes up every parse waiting on the token at once; parses started with
+    a cancelled token fail immediately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._waiters = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        """Cancel all parses using this token."""
+        with self._lock:
+            self._cancelled = True
+            waiters, self._waiters = self._waiters, set()
+        for future in waiters:
+            _settle(future, exception=ParseCancelled("parse cancelled"))
+
+    def _register(self, future: Future) -> bool:
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._waiters.add(future)
+            return True
+
+    def _unregister(self, future: Future):
+        with self._lock:
+            self._waiters.discard(future)
+
+
+_settle_lock = threading.Lock()
+
+
+def _settle(future: Future, result: Any = None, exception: Optional[BaseException] = None):
+    """Complete future unless it is already done; the first outcome wins."""
+    with _settle_lock:
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+def check(statement: str, limits: Limits, cancel: Optional[CancelToken] = None, deadline: Optional[float] = None):
+    """
+    Check a statement against max_bytes, max_tokens and max_depth.
+
+    Args:
+        statement: SQL text
+        limits: Limits to check, None values are not checked
+        cancel: Token checked while scanning
+        deadline: time.monotonic() value after which the scan stops
+
+    Raises:
+        LimitExceeded, ParseTimeout, ParseCancelled
+    """
+    if limits.max_bytes is not None and len(statement) * 4 > limits.max_bytes:
+        # Only encode when the character count alone does not decide.
+        if len(statement) > limits.max_bytes or len(statement.encode("utf-8", "surrogatepass")) > limits.max_bytes:
+            raise LimitExceeded("max_bytes", limits.max_bytes)
+    max_tokens, max_depth = limits.max_tokens, limits.max_depth
+    if max_tokens is None and max_depth is None:
+        return
+    tokens = depth = 0
+    for m in _TOKEN.finditer(statement):
+        group = m.lastgroup
+        if group == "skip":
+            continue
+        tokens += 1
+        if max_tokens is not None and tokens > max_tokens:
+            raise LimitExceeded("max_tokens", max_tokens)
+        if group == "open":
+            depth += 1
+            if max_depth is not None and depth > max_depth:
+                raise LimitExceeded("max_depth", max_depth)
+        elif group == "close":
+            depth = max(0, depth - 1)
+        if tokens % _CHECK_EVERY == 0:
+            if cancel is not None and cancel.cancelled:
+                raise ParseCancelled("parse cancelled")
+            if deadline is not None and time.monotonic() > deadline:
+                raise ParseTimeout("parse did not finish within the timeout")
+
+
+def parse_limited(statement, kind: str = "query", pure: bool = False, timeout_ms: Optional[int] = None,
+                  max_depth: Optional[int] = None, max_tokens: Optional[int] = None,
+                  max_bytes: Optional[int] = None, cancel: Optional[CancelToken] = None) -> Any:
+    """
+    Parse a statement under resource limits.
+
+    Args:
+        statement: SQL text, str or UTF-8 buffer
+        kind: Wrapper kind, see pysqlparse.batch.parse_statement
+        pure: Parse SQL without note
+        timeout_ms: Maximum time to wait for the parse, including the limit checks
+        max_depth: Maximum parenthesis nesting depth
+        max_tokens: Maximum number of tokens, not counting whitespace and comments
+        max_bytes: Maximum size of the UTF-8 encoded input
+        cancel: Token to cancel the parse from another thread
+
+    Returns:
+        The parsed wrapper object
+
+    Raises:
+        LimitExceeded: If the input exceeds max_bytes, max_tokens or max_depth
+        ParseTimeout: If the parse does not finish within timeout_ms
+        ParseCancelled: If cancel is cancelled before the parse finished
+        ParseBusy: If timeout_ms or cancel is given and all workers are busy, see
+                   set_limited_workers
+    """
+    from pysqlparse.batch import parse_statement
+
+    deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms is not None else None
+    if cancel is not None and cancel.cancelled:
+        raise ParseCancelled("parse cancelled")
+    if max_bytes is not None and not isinstance(statement, str):
+        # Reject an oversized buffer before decoding it.
+        with memoryview(statement) as view:
+            if view.nbytes > max_bytes:
+                raise LimitExceeded("max_bytes", max_bytes)
+    statement = as_text(statement)
+    check(statement, Limits(timeout_ms, max_depth, max_tokens, max_bytes), cancel, deadline)
+    if deadline is None and cancel is None:
+        return parse_statement(statement, kind, pure)
+
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        raise ParseBusy("all workers are busy with earlier parses")
+    future = Future()
+    if cancel is not None and not cancel._register(future):
+        slots.release()
+        raise ParseCancelled("parse cancelled")
+
+    def work():
+        try:
+            _settle(future, parse_statement(statement, kind, pure))
+        except BaseException as e:
+            _settle(future, exception=e)
+        finally:
+            slots.release()
+
+    try:
+        threading.Thread(target=work, name="pysqlparse-limited", daemon=True).start()
+    except BaseException:
+        slots.release()
+        if cancel is not None:
+            cancel._unregister(future)
+        raise
+    try:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            raise ParseTimeout(f"parse did not finish within {timeout_ms} ms") from None
+    finally:
+        if cancel is not None:
+            cancel._unregister(future)
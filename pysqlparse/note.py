@@ -0,0 +1,229 @@
+"""
+Streaming comment (note) stripping for inputs too large for strip_note.
+
+The stripper tracks string and identifier quotes, ``$tag$`` bodies and comments
+across chunk boundaries, so comments are removed correctly no matter where the input
+is cut. Line comments are removed up to the end of the line (the line break is kept)
+and block comments are replaced by a single space, so tokens around them stay apart.
+It works on str or, without any decoding, on UTF-8 bytes.
+"""
+import re
+from typing import Iterable, Iterator, Union
+
+from pysqlparse.conf import DEFAULT_CHUNK_SIZE
+
+
+_OPEN_PATTERN = r"--|/\*|['\"`]|(?<![\w$])\$(?:[A-Za-z_]\w*)?\$"
+# Unfinished opener at the end of a chunk: '-', '/' or the start of a dollar tag.
+_TAIL_PATTERN = r"(?:[-/]|(?<![\w$])\$(?:[A-Za-z_]\w*)?)\Z"
+
+_CODE, _LINE, _BLOCK, _QUOTE, _DOLLAR = range(5)
+
+
+class _Syntax(object):
+    """Patterns and constants for str or bytes input."""
+
+    def __init__(self, binary: bool):
+        def encode(s):
+            return s.encode("ascii") if binary else s
+
+        self.empty = encode("")
+        self.space = encode(" ")
+        self.line_open = encode("--")
+        self.block_open = encode("/*")
+        self.newline = encode("\n")
+        self.block_close = encode("*/")
+        self.backslash = encode("\\")
+        self.opener = re.compile(encode(_OPEN_PATTERN))
+        self.tail = re.compile(encode(_TAIL_PATTERN))
+        self.quotes = {
+            encode(q): re.compile(encode(r"[\\%s]" % q if q != "`" else "`"))
+            for q in ("'", '"', "`")
+        }
+
+
+_SYNTAX = {False: _Syntax(False), True: _Syntax(True)}
+
+
+class NoteStripper(object):
+    """
+    Remove comments from SQL text fed in chunks.
+
+    Memory stays bounded by one chunk: comment bodies are dropped and quoted strings
+    are passed through as they are read, however long they are.
+
+    Args:
+        binary: Work on UTF-8 bytes instead of str
+    """
+
+    def __init__(self, binary: bool = False):
+        self._syntax = _SYNTAX[bool(binary)]
+        self._buf = self._syntax.empty
+        # Leading characters of _buf that were already emitted, kept as lookbehind context.
+        self._skip = 0
+        self._state = _CODE
+        self._closer = None
+
+    def feed(self, chunk: Union[str, bytes]) -> Union[str, bytes]:
+        """
+        Add a chunk of input.
+
+        Args:
+            chunk: Next piece of the SQL text, str or bytes as given to the constructor
+
+        Returns:
+            The stripped text that can be emitted so far
+        """
+        return self._scan(self._buf + chunk, False)
+
+    def close(self) -> Union[str, bytes]:
+        """
+        Signal the end of input.
+
+        Returns:
+            The remaining stripped text; an unterminated comment is dropped
+        """
+        out = self._scan(self._buf, True)
+        self._buf = self._syntax.empty
+        self._skip = 0
+        self._state = _CODE
+        self._closer = None
+        return out
+
+    def _scan(self, buf, final: bool):
+        syntax = self._syntax
+        n = len(buf)
+        pos = self._skip
+        out = []
+        while pos < n:
+            state = self._state
+            if state == _CODE:
+                m = syntax.opener.search(buf, pos)
+                if m is None:
+                    tail = None if final else syntax.tail.search(buf, max(pos, n - 256))
+                    tail = n if tail is None else tail.start()
+                    out.append(buf[pos:tail])
+                    pos = tail
+                    break
+                out.append(buf[pos:m.start()])
+                token = m.group()
+                pos = m.end()
+                if token == syntax.line_open:
+                    self._state = _LINE
+                elif token == syntax.block_open:
+                    self._state = _BLOCK
+                elif len(token) == 1:
+                    out.append(token)
+                    self._state = _QUOTE
+                    self._closer = token
+                else:
+                    out.append(token)
+                    self._state = _DOLLAR
+                    self._closer = token
+            elif state == _LINE:
+                end = buf.find(syntax.newline, pos)
+                if end < 0:
+                    pos = n
+                    break
+                self._state = _CODE
+                pos = end
+            elif state == _BLOCK:
+                end = buf.find(syntax.block_close, pos)
+                if end < 0:
+                    # Keep a trailing '*' that may be closed by the next chunk.
+                    pos = n if final else max(pos, n - 1)
+                    break
+                out.append(syntax.space)
+                self._state = _CODE
+                pos = end + 2
+            elif state == _QUOTE:
+                m = syntax.quotes[self._closer].search(buf, pos)
+                if m is None:
+                    out.append(buf[pos:])
+                    pos = n
+                    break
+                if m.group() == syntax.backslash:
+                    if m.end() >= n and not final:
+                        out.append(buf[pos:m.start()])
+                        pos = m.start()
+                        break
+                    out.append(buf[pos:m.end() + 1])
+                    pos = m.end() + 1
+                    continue
+                if m.end() >= n and not final:
+                    # A doubled quote may continue in the next chunk.
+                    out.append(buf[pos:m.start()])
+                    pos = m.start()
+                    break
+                if buf[m.end():m.end() + 1] == self._closer:
+                    out.append(buf[pos:m.end() + 1])
+                    pos = m.end() + 1
+                    continue
+                out.append(buf[pos:m.end()])
+                self._state = _CODE
+                self._closer = None
+                pos = m.end()
+            else:
+                end = buf.find(self._closer, pos)
+                if end < 0:
+                    # Keep a possible partial closing tag.
+                    safe = n if final else max(pos, n - len(self._closer) + 1)
+                    out.append(buf[pos:safe])
+                    pos = safe
+                    break
+                out.append(buf[pos:end + len(self._closer)])
+                pos = end + len(self._closer)
+                self._state = _CODE
+                self._closer = None
+        # Keep one emitted character before the unprocessed rest for the dollar lookbehind.
+        self._skip = min(pos, 1)
+        self._buf = buf[pos - self._skip:]
+        return syntax.empty.join(out)
+
+
+def iter_strip_note(chunks: Iterable[Union[str, bytes]]) -> Iterator[Union[str, bytes]]:
+    """
+    Strip comments from SQL text given as an iterable of chunks.
+
+    Args:
+        chunks: str chunks, or UTF-8 bytes chunks which are processed without decoding
+
+    Returns:
+        Generator of stripped pieces of the same type as the input, as soon as they are known
+    """
+    stripper = None
+    for chunk in chunks:
+        if stripper is None:
+            stripper = NoteStripper(binary=not isinstance(chunk, str))
+        if not isinstance(chunk, (str, bytes)):
+            chunk = bytes(chunk)
+        out = stripper.feed(chunk)
+        if out:
+            yield out
+    if stripper is not None:
+        out = stripper.close()
+        if out:
+            yield out
+
+
+def strip_note_stream(reader, writer, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Strip comments from a stream, reading and writing in chunks.
+
+    A binary reader is processed as UTF-8 bytes without decoding; the writer must accept
+    the same type the reader returns.
+
+    Args:
+        reader: Object with a read(size) method, e.g. a text or binary file
+        writer: Object with a write method
+        chunk_size: Number of characters (or bytes) read at a time
+
+    Returns:
+        Number of characters (or bytes) written
+    """
+    written = 0
+    for out in iter_strip_note(iter(lambda: reader.read(chunk_size), reader.read(0))):
+        writer.write(out)
+        written += len(out)
+    return written
+
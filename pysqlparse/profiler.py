@@ -0,0 +1,119 @@
+"""
+Opt-in per-phase profiling of parse calls.
+
+Install a callback with set_profiler(); it then receives a PhaseStats record for every
+sampled parse, AST, format and tokens call. While no profiler is installed the
+instrumented calls cost one global lookup, so it can stay enabled in production
+at a low sample rate.
+"""
+import functools
+import random
+import re
+import sys
+from collections import namedtuple
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+
+PhaseStats = namedtuple("PhaseStats", ("phase", "kind", "seconds", "bytes", "tokens", "allocations", "depth"))
+PhaseStats.__doc__ = """
+Statistics of one profiled call.
+
+phase: "parse", "ast", "format" or "tokens"
+kind: statement kind, e.g. "query", "insert" or "sql"
+seconds: wall time of the call
+bytes: UTF-8 encoded size of the parsed input (parse) or of the produced text (ast, format),
+       None if unknown
+tokens: number of tokens returned (tokens), otherwise None
+allocations: net number of Python memory blocks allocated by the call
+depth: peak parenthesis nesting depth of the parsed input (parse), otherwise None
+"""
+
+_callback: Optional[Callable[[PhaseStats], Any]] = None
+_sample_rate = 1.0
+
+_PAREN = re.compile(r"'(?:[^'\\]|\\.)*'|\"[^\"]*\"|`[^`]*`|--[^\n]*|/\*.*?\*/|[()]", re.S)
+
+
+def set_profiler(callback: Optional[Callable[[PhaseStats], Any]], sample_rate: float = 1.0):
+    """
+    Install or remove the profiler callback.
+
+    Statement objects decide at construction whether their ast/format/tokens calls
+    are profiled, so objects created before set_profiler() are not instrumented.
+
+    Args:
+        callback: Called with a PhaseStats for every sampled call, None to disable profiling
+        sample_rate: Fraction of calls to profile, between 0 and 1
+    """
+    global _callback, _sample_rate
+    if not 0 <= sample_rate <= 1:
+        raise ValueError("sample_rate must be between 0 and 1")
+    _sample_rate = sample_rate
+    _callback = callback
+
+
+def enabled() -> bool:
+    """Return True if a profiler callback is installed."""
+    return _callback is not None
+
+
+def nesting_depth(statement: str) -> int:
+    """Return the peak parenthesis nesting depth of a statement, ignoring quotes and comments."""
+    depth = peak = 0
+    for m in _PAREN.finditer(statement):
+        token = m.group()
+        if token == "(":
+            depth += 1
+            if depth > peak:
+                peak = depth
+        elif token == ")":
+            depth -= 1
+    return peak
+
+
+def _encoded_size(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8", "surrogatepass"))
+
+
+def call(phase: str, kind: str, func: Callable, *args, source=None) -> Any:
+    """
+    Call func(*args), reporting a PhaseStats to the profiler if the call is sampled.
+
+    Args:
+        phase: Phase name reported in PhaseStats
+        kind: Statement kind reported in PhaseStats
+        func: The callable to run
+        args: Arguments of func
+        source: Parsed input text, used for the bytes and depth statistics
+    """
+    callback = _callback
+    if callback is None or (_sample_rate < 1 and random.random() >= _sample_rate):
+        return func(*args)
+    blocks = sys.getallocatedblocks()
+    start = perf_counter()
+    result = func(*args)
+    seconds = perf_counter() - start
+    allocations = sys.getallocatedblocks() - blocks
+    if isinstance(source, str):
+        size = _encoded_size(source)
+    elif source is not None:
+        size = len(source)
+    elif isinstance(result, str):
+        size = _encoded_size(result)
+    else:
+        size = None
+    tokens = len(result) if phase == "tokens" and result is not None else None
+    depth = nesting_depth(source) if phase == "parse" and isinstance(source, str) else None
+    callback(PhaseStats(phase, kind, seconds, size, tokens, allocations, depth))
+    return result
+
+
+def wrap(phase: str, kind: str, func: Callable) -> Callable:
+    """Return func instrumented with call()."""
+    def profiled(*args, **kwargs):
+        if kwargs:
+            return call(phase, kind, functools.partial(func, **kwargs), *args)
+        return call(phase, kind, func, *args)
+    profiled.__doc__ = func.__doc__
+    return profiled
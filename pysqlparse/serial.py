@@ -0,0 +1,188 @@
+"""
+Versioned binary serialization of parsed statements.
+
+Layout: magic ``PSQP``, format version (uint16), length-prefixed class name and the
+field dict in a self-describing tagged encoding: every value is one type tag byte
+followed by its little-endian, length-prefixed content. Only None, bool, int, float,
+str, bytes, list, tuple and dict are supported. The encoding does not depend on the
+Python version, and decoding checks every tag and length, so a version mismatch or
+malformed data raises SerializationError instead of misreading the payload.
+"""
+import importlib
+import struct
+from typing import Any, Dict, List, Tuple
+
+
+MAGIC = b"PSQP"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<4sHH")
+_LENGTH = struct.Struct("<I")
+_FLOAT = struct.Struct("<d")
+
+_NONE = b"N"
+_TRUE = b"T"
+_FALSE = b"F"
+_INT = b"i"
+_FLOAT_TAG = b"f"
+_STR = b"s"
+_BYTES = b"b"
+_LIST = b"l"
+_TUPLE = b"t"
+_DICT = b"d"
+
+_classes: Dict[str, type] = {}
+
+
+class SerializationError(ValueError):
+    """Raised for data that is not a serialized statement of a supported format version."""
+
+
+def register(cls: type) -> type:
+    """Register a class so that its serialized objects can be restored by class name."""
+    _classes[cls.__name__] = cls
+    return cls
+
+
+def _encode(value: Any, out: List[bytes]):
+    if value is None:
+        out.append(_NONE)
+    elif isinstance(value, bool):
+        out.append(_TRUE if value else _FALSE)
+    elif isinstance(value, int):
+        data = str(value).encode("ascii")
+        out.extend((_INT, _LENGTH.pack(len(data)), data))
+    elif isinstance(value, float):
+        out.extend((_FLOAT_TAG, _FLOAT.pack(value)))
+    elif isinstance(value, str):
+        data = value.encode("utf-8", "surrogatepass")
+        out.extend((_STR, _LENGTH.pack(len(data)), data))
+    elif isinstance(value, bytes):
+        out.extend((_BYTES, _LENGTH.pack(len(value)), bytes(value)))
+    elif isinstance(value, (list, tuple)):
+        out.extend((_TUPLE if isinstance(value, tuple) else _LIST, _LENGTH.pack(len(value))))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out.extend((_DICT, _LENGTH.pack(len(value))))
+        for k, v in value.items():
+            _encode(k, out)
+            _encode(v, out)
+    else:
+        raise SerializationError(f"unsupported type {type(value).__name__}")
+
+
+class _Reader(object):
+
+    def __init__(self, data: bytes, pos: int):
+        self.data = data
+        self.pos = pos
+
+    def take(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.data):
+            raise SerializationError("truncated data")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def length(self) -> int:
+        return _LENGTH.unpack(self.take(_LENGTH.size))[0]
+
+    def value(self) -> Any:
+        tag = self.take(1)
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            return int(self.take(self.length()).decode("ascii"))
+        if tag == _FLOAT_TAG:
+            return _FLOAT.unpack(self.take(_FLOAT.size))[0]
+        if tag == _STR:
+            return self.take(self.length()).decode("utf-8", "surrogatepass")
+        if tag == _BYTES:
+            return self.take(self.length())
+        if tag == _LIST or tag == _TUPLE:
+            items = [self.value() for _ in range(self.length())]
+            return items if tag == _LIST else tuple(items)
+        if tag == _DICT:
+            out = {}
+            for _ in range(self.length()):
+                key = self.value()
+                out[key] = self.value()
+            return out
+        raise SerializationError(f"corrupt data: unknown type tag {tag!r}")
+
+
+def dumps(cls_name: str, fields: Dict[str, Any]) -> bytes:
+    """
+    Serialize the fields of a statement object.
+
+    Raises:
+        SerializationError: If a field holds a value that cannot be serialized
+    """
+    name = cls_name.encode("ascii")
+    out = [_HEADER.pack(MAGIC, FORMAT_VERSION, len(name)), name]
+    try:
+        _encode(fields, out)
+    except (SerializationError, ValueError, struct.error) as e:
+        raise SerializationError(f"cannot serialize {cls_name}: {e}") from None
+    except RecursionError:
+        raise SerializationError(f"cannot serialize {cls_name}: nested too deeply") from None
+    return b"".join(out)
+
+
+def loads(data) -> Tuple[str, Dict[str, Any]]:
+    """
+    Read serialized statement data.
+
+    Returns:
+        (class name, fields)
+
+    Raises:
+        SerializationError: If data is malformed or of another format version
+    """
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise SerializationError("truncated data")
+    magic, version, name_length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SerializationError("not a serialized pysqlparse statement")
+    if version != FORMAT_VERSION:
+        raise SerializationError(f"unsupported format version {version}, expected {FORMAT_VERSION}")
+    reader = _Reader(data, _HEADER.size)
+    try:
+        cls_name = reader.take(name_length).decode("ascii")
+        fields = reader.value()
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        if isinstance(e, SerializationError):
+            raise
+        raise SerializationError(f"corrupt data: {e}") from None
+    except RecursionError:
+        raise SerializationError("corrupt data: nested too deeply") from None
+    if reader.pos != len(data):
+        raise SerializationError("corrupt data: trailing bytes")
+    if not isinstance(fields, dict):
+        raise SerializationError("corrupt data: fields are not a dict")
+    return cls_name, fields
+
+
+def statement_class(cls_name: str) -> type:
+    """Return the registered class of the given name, importing it from pysqlparse if needed."""
+    cls = _classes.get(cls_name)
+    if cls is None:
+        # The package imports its classes lazily, so the class may not be registered yet.
+        getattr(importlib.import_module("pysqlparse"), cls_name, None)
+        cls = _classes.get(cls_name)
+        if cls is None:
+            raise SerializationError(f"unknown statement class {cls_name!r}")
+    return cls
+
+
+def restore(data) -> Any:
+    """Restore any registered statement object from its serialized data (pickle support)."""
+    cls_name, fields = loads(data)
+    return statement_class(cls_name)._from_fields(fields)
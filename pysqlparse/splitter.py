@@ -0,0 +1,318 @@
+"""
+Incremental splitting of SQL text into statements.
+
+The splitter only tracks what is needed to find statement boundaries: string and
+identifier quotes, comments, dollar-quoted bodies and BEGIN ... END / CASE ... END
+blocks. It keeps at most the current statement plus one chunk in memory.
+
+BEGIN only opens a block where a block can start: as the first word of a statement
+(an anonymous block, unless a transaction word follows), in the header of a CREATE
+PROCEDURE / FUNCTION / TRIGGER / EVENT / PACKAGE statement after AS, IS, ')' and the
+words that can end a routine header, and inside a block at the start of an inner
+statement. Anywhere else BEGIN is an identifier, e.g. a column name.
+"""
+import codecs
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+from pysqlparse.conf import DEFAULT_CHUNK_SIZE
+
+
+_BOUNDARY = r"""
+    (?P<comment>--|/\*)
+  | (?P<quote>['"`])
+  | (?P<dollar>(?<![\w$])\$(?:[A-Za-z_]\w*)?\$)
+  | (?P<word>(?<![\w$.])%s(?![\w$]))
+  | (?P<semi>;)
+"""
+
+# Only block keywords are interesting while no BEGIN/END decision is pending.
+_NORMAL = re.compile(_BOUNDARY % "(?:begin|end|case)", re.X | re.I)
+# After BEGIN/END the next word decides whether a block was opened or closed.
+_PENDING = re.compile(_BOUNDARY % "[A-Za-z_][\\w$]*", re.X | re.I)
+
+_QUOTED = {
+    "'": re.compile(r"[^'\\]*(?:(?:\\.|'')[^'\\]*)*'", re.S),
+    '"': re.compile(r'[^"\\]*(?:(?:\\.|"")[^"\\]*)*"', re.S),
+    "`": re.compile(r"[^`]*(?:``[^`]*)*`"),
+}
+
+# Unconsumed tail of a chunk: a partial word plus one character that may start a token.
+_TAIL = re.compile(r"[\w$]*[^\w$]?\Z")
+_TAIL_WINDOW = 256
+
+# BEGIN followed by one of these starts a transaction, not a block.
+_TRANSACTION_WORDS = frozenset((
+    ";", "TRANSACTION", "TRAN", "WORK", "DEFERRED", "IMMEDIATE", "EXCLUSIVE", "ISOLATION", "READ",
+))
+# END followed by one of these closes a block that was never counted as opened.
+_LOOP_WORDS = frozenset(("IF", "LOOP", "WHILE", "REPEAT", "FOR"))
+
+# Statements whose header may be followed by a BEGIN ... END body.
+_ROUTINE = re.compile(r"""
+    (?:\s+|--[^\n]*(?:\n|\Z)|/\*.*?\*/)*
+    CREATE\s+(?:OR\s+REPLACE\s+)?(?:DEFINER\s*=\s*\S+\s+)?
+    (?:(?:TEMP|TEMPORARY|AGGREGATE|CONSTRAINT|EDITIONABLE|NONEDITIONABLE)\s+)*
+    (?P<routine>PROCEDURE|FUNCTION|TRIGGER|EVENT|PACKAGE)\b
+""", re.X | re.I | re.S)
+# Last tokens before a routine body: AS/IS, ')' of the parameters, FOR EACH ROW, DO of
+# an event and the characteristics ending a header (DETERMINISTIC, CONTAINS SQL,
+# READS SQL DATA, SQL SECURITY DEFINER, COMMENT '...'). The type after RETURNS is
+# checked separately.
+_ROUTINE_BODY_PREV = frozenset((
+    "AS", "IS", ")", "ROW", "DO", "DETERMINISTIC", "SQL", "DATA", "DEFINER", "INVOKER", "'",
+))
+# A trigger header only names columns after OF and in parenthesized lists, so after any
+# other word or ')' a BEGIN starts the body (e.g. "ON t BEGIN", "WHEN new.a > 0 BEGIN").
+_TRIGGER_NOT_BODY_PREV = frozenset(("OF", ",", "("))
+# Tokens after which a BEGIN inside a block starts a nested block.
+_INNER_BLOCK_PREV = frozenset((";", ":", ")", "BEGIN", "THEN", "ELSE", "DO", "LOOP", "REPEAT", "AS", "IS"))
+
+_PREV_TOKENS = re.compile(r"[\w$]+|\S")
+_PREV_WINDOW = 64
+
+Statement = Tuple[int, int, str]
+
+
+class StatementSplitter(object):
+    """
+    Split SQL text fed in chunks into statements.
+
+    Every statement is returned as ``(start, end, text)`` where ``text`` is the statement
+    without the terminating semicolon and surrounding whitespace, and ``start``/``end``
+    are its character offsets in the whole input. Statements containing nothing but
+    comments are dropped.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._start = 0
+        self._offset = 0
+        # Open BEGIN and CASE constructs, innermost last.
+        self._blocks = []
+        self._pending = None
+        self._code = False
+        # The two last significant tokens of the statement (words upper-cased, "'" for
+        # any quoted token), used to tell a block BEGIN from an identifier.
+        self._prev = None
+        self._prev2 = None
+        self._routine = None
+
+    def feed(self, chunk: str) -> List[Statement]:
+        """
+        Add a chunk of input.
+
+        Args:
+            chunk: Next piece of the SQL text
+
+        Returns:
+            Statements completed by this chunk
+        """
+        self._buf += chunk
+        return self._scan(False)
+
+    def close(self) -> List[Statement]:
+        """
+        Signal the end of input.
+
+        Returns:
+            The remaining statements, including a trailing one without semicolon
+        """
+        out = self._scan(True)
+        self._emit(out, len(self._buf))
+        self._buf = ""
+        self._pos = self._start = 0
+        self._blocks = []
+        self._pending = None
+        return out
+
+    def _scan(self, final: bool) -> List[Statement]:
+        buf = self._buf
+        n = len(buf)
+        pos = self._pos
+        out = []
+        while True:
+            m = (_PENDING if self._pending else _NORMAL).search(buf, pos)
+            if m is None:
+                tail = n if final else _TAIL.search(buf, max(pos, n - _TAIL_WINDOW)).start()
+                self._mark_code(pos, tail)
+                pos = tail
+                break
+            if m.end() >= n and not final:
+                # The token may continue in the next chunk.
+                self._mark_code(pos, m.start())
+                pos = m.start()
+                break
+            self._mark_code(pos, m.start())
+            kind = m.lastgroup
+            token = m.group()
+            if kind == "semi":
+                if self._pending:
+                    self._resolve_pending(";")
+                self._push_prev(";")
+                if not self._blocks:
+                    self._emit(out, m.start())
+                    self._start = m.end()
+                pos = m.end()
+                continue
+            if kind == "word":
+                self._code = True
+                self._on_word(token.upper(), m.start())
+                pos = m.end()
+                continue
+            if kind == "comment":
+                closer = "\n" if token == "--" else "*/"
+                end = buf.find(closer, m.end())
+            elif kind == "quote":
+                self._code = True
+                q = _QUOTED[token].match(buf, m.end())
+                end = q.end() if q is not None else -1
+                closer = ""
+                if end >= n and not final:
+                    end = -1
+            else:
+                self._code = True
+                closer = token
+                end = buf.find(closer, m.end())
+            if end < 0:
+                if not final:
+                    pos = m.start()
+                    break
+                pos = n
+                continue
+            if kind != "comment":
+                self._push_prev("'")
+            pos = end + len(closer)
+
+        self._pos = pos
+        if self._start:
+            self._buf = buf[self._start:]
+            self._pos -= self._start
+            self._offset += self._start
+            self._start = 0
+        return out
+
+    def _mark_code(self, start: int, end: int):
+        """Note the code between two scanned tokens, keeping its last two tokens."""
+        if end <= start:
+            return
+        tail = self._buf[max(start, end - _PREV_WINDOW):end]
+        if tail.isspace():
+            if end - start <= _PREV_WINDOW or self._buf[start:end].isspace():
+                return
+            tail = self._buf[start:end].rstrip()[-_PREV_WINDOW:]
+        self._code = True
+        tokens = _PREV_TOKENS.findall(tail)
+        if len(tokens) == 1:
+            self._push_prev(tokens[0].upper())
+        else:
+            self._prev2, self._prev = tokens[-2].upper(), tokens[-1].upper()
+
+    def _push_prev(self, token: str):
+        self._prev2, self._prev = self._prev, token
+
+    def _on_word(self, word: str, start: int):
+        if not (self._pending and self._resolve_pending(word)):
+            if word == "END":
+                self._pending = word
+            elif word == "BEGIN":
+                if self._opens_block(start):
+                    self._pending = word
+            elif word == "CASE":
+                self._blocks.append(word)
+        self._push_prev(word)
+
+    def _opens_block(self, start: int) -> bool:
+        """Return True if a BEGIN at start (in the buffer) may open a block."""
+        prev = self._prev
+        if prev is None:
+            return True
+        if "BEGIN" in self._blocks:
+            return prev in _INNER_BLOCK_PREV
+        if self._blocks:
+            return False
+        if self._routine is None:
+            m = _ROUTINE.match(self._buf, self._start, start)
+            self._routine = m.group("routine").upper() if m is not None else ""
+        if self._routine == "TRIGGER":
+            return prev not in _TRIGGER_NOT_BODY_PREV
+        return bool(self._routine) and (prev in _ROUTINE_BODY_PREV or self._prev2 == "RETURNS")
+
+    def _resolve_pending(self, word: str) -> bool:
+        """Settle a pending BEGIN/END with the following word, return True if it was consumed."""
+        pending = self._pending
+        self._pending = None
+        if pending == "BEGIN":
+            if word in _TRANSACTION_WORDS:
+                return True
+            self._blocks.append(pending)
+            return False
+        if word in _LOOP_WORDS:
+            return True
+        if self._blocks:
+            self._blocks.pop()
+        return word == "CASE"
+
+    def _emit(self, out: List[Statement], end: int):
+        if self._code:
+            raw = self._buf[self._start:end]
+            text = raw.strip()
+            start = self._offset + self._start + len(raw) - len(raw.lstrip())
+            out.append((start, start + len(text), text))
+        self._code = False
+        self._prev = self._prev2 = None
+        self._routine = None
+
+
+def split_statements(sql: str) -> List[Statement]:
+    """
+    Split a complete SQL text into statements.
+
+    Args:
+        sql: SQL text containing any number of statements
+
+    Returns:
+        List of (start, end, text) tuples in input order
+    """
+    splitter = StatementSplitter()
+    return splitter.feed(sql) + splitter.close()
+
+
+def iter_statements(chunks: Iterable[str]) -> Iterator[Statement]:
+    """
+    Split SQL text arriving as an iterable of chunks, yielding statements as they complete.
+
+    Args:
+        chunks: Iterable of consecutive pieces of SQL text
+
+    Returns:
+        Iterator of (start, end, text) tuples in input order
+    """
+    splitter = StatementSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+def read_chunks(fp, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Read a file object in chunks of chunk_size.
+
+    Binary file objects and mmap objects are decoded from UTF-8 incrementally, so a
+    multibyte character split across two reads is decoded correctly.
+    """
+    decoder = None
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        if not isinstance(chunk, str):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = decoder.decode(chunk)
+        yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b"", True)
+        if tail:
+            yield tail
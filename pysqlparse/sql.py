@@ -2,9 +2,35 @@ import os.path
 
 from pysqlparse.conf import *
 from pysqlparse import pysqlparser
+from pysqlparse import incremental
+from pysqlparse import interning
+from pysqlparse import lexer
+from pysqlparse import profiler
+from pysqlparse import serial
+from pysqlparse import splitter
+from pysqlparse import tree
+from pysqlparse import utils
+from pysqlparse.utils import as_text
 
+_missing = object()
 
-class Sql(pysqlparser.Sql):
+# Native statement classes of Sql items and the wrapper classes of pysqlparse.statement.
+_TYPED_STATEMENTS = {
+    "Dql": "Query",
+    "Insert": "Insert",
+    "View": "View",
+    "WithStatement": "Cte",
+    "Update": "Update",
+    "Delete": "Delete",
+    "Create": "TableDDL",
+}
+
+# Statement kinds of pysqlparse.lexer.statement_kind and their wrapper classes.
+_LEVEL_KINDS = {"insert": "Insert", "view": "View", "cte": "Cte"}
+_PLAIN_KINDS = {"update": "Update", "delete": "Delete", "create": "TableDDL"}
+
+
+class Sql(object):
     """
     Parse SQL statements, which can be any combination or single statement of:
     CREATE TABLE, SELECT, INSERT, DELETE, VIEW, UPDATE, etc.
@@ -12,33 +38,118 @@ class Sql(pysqlparser.Sql):
     (Note: Token extraction is currently not supported due to dialect differences in CREATE TABLE statements)
 
     Parameters:
-        sql_statements: SQL statement string to be parsed
+        sql_statements: SQL statement string to be parsed, or a UTF-8 buffer (bytes, mmap, ...)
         file: SQL file
         name: Name for the parsed content
         pure: Whether to ignore comments
+        cache: Optional pysqlparse.DiskCache; statements, typed statements, AST, format and
+               tokens results are then cached by content hash and reused for unchanged input
 
     Note: Either sql_statements or file must be provided.
     - If only file is provided, the SQL file will be loaded and parsed.
     - If both are provided, sql_statements will be cached to the file.
+
+    The native pysqlparser.Sql object is created on first use: right away without a cache,
+    and with a cache only when a result is not cached, so a fully cached input is never
+    parsed (and syntax errors of such input surface on the first result not cached).
+
+    Compatibility: Sql wraps the native object instead of subclassing pysqlparser.Sql,
+    because the native constructor cannot be skipped in a subclass. Attributes of the
+    native object not defined here, e.g. get_items, are delegated to it, but
+    isinstance(obj, pysqlparser.Sql) is False; use obj.native where the native type is
+    required.
     """
     def __init__(
             self,
             sql_statements=None,
             file=None,
             name="",
-            pure=False
+            pure=False,
+            cache=None
     ):
         if not sql_statements and not file:
             raise Exception("empty SQL statement or file")
+        elif cache is not None and not sql_statements:
+            with open(file, encoding="utf-8") as fp:
+                sql_statements, file = fp.read(), None
+            args = (sql_statements, False, pure, name)
         elif not file:
-            super(Sql, self).__init__(sql_statements, False, pure, name)
+            args = (as_text(sql_statements), False, pure, name)
         elif not sql_statements:
-            super(Sql, self).__init__(file, pure, name)
+            args = (file, pure, name)
         else:
             file_path = os.path.abspath(file)
-            super(Sql, self).__init__(sql_statements, True, file_path, name)
+            args = (as_text(sql_statements), True, file_path, name)
+        self._source = (args[0] if sql_statements else None, file, name, pure)
+        self._args = args
+        self._sql = None
         self._items = None
         self._statements = None
+        self._segments = None
+        self._strings = None
+        self._cache = cache
+        self._digest = cache.digest(args[0]) if cache is not None else None
+        if cache is None:
+            self._native()
+
+    def _native(self):
+        """
+        Return the native pysqlparser.Sql object, parsing the input on first use.
+        """
+        if self._sql is None:
+            if profiler.enabled():
+                self._sql = profiler.call("parse", "sql", pysqlparser.Sql, *self._args, source=self._source[0])
+            else:
+                self._sql = pysqlparser.Sql(*self._args)
+        return self._sql
+
+    @property
+    def native(self):
+        """
+        Get the native pysqlparser.Sql object, parsing the input if that has not happened yet.
+        :return: pysqlparser.Sql of the current input
+        """
+        return self._native()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        return getattr(self._native(), name)
+
+    def __dir__(self):
+        return sorted(set(super(Sql, self).__dir__()) | set(dir(pysqlparser.Sql)))
+
+    def to_bytes(self):
+        """
+        Serialize the Sql object into a compact, versioned binary form.
+        Only the input (statements text or file path, name, pure) is recorded,
+        so from_bytes parses it again.
+        :return: serialized bytes
+        """
+        sql_statements, file, name, pure = self._source
+        fields = {"sql_statements": sql_statements, "file": None if sql_statements else os.fspath(file),
+                  "name": name, "pure": pure}
+        return serial.dumps(self.__class__.__name__, fields)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Restore a Sql object serialized with to_bytes.
+        :param data: serialized bytes
+        :return: Sql object
+        """
+        cls_name, fields = serial.loads(data)
+        klass = serial.statement_class(cls_name)
+        if not issubclass(klass, cls):
+            raise serial.SerializationError(f"data holds a {cls_name}, not a {cls.__name__}")
+        return klass._from_fields(fields)
+
+    @classmethod
+    def _from_fields(cls, fields):
+        return cls(**fields)
+
+    def __reduce__(self):
+        return serial.restore, (self.to_bytes(),)
 
     @property
     def items(self):
@@ -47,7 +158,10 @@ class Sql(pysqlparser.Sql):
         :return: The initialized value of the _items attribute.
         """
         if self._items is None:
-            self._items = self.get_items()
+            if self._segments is not None:
+                self._items = [item for items in self._from_segments("get_items") for item in items]
+            else:
+                self._items = self._native().get_items()
         return self._items
 
     @property
@@ -57,26 +171,328 @@ class Sql(pysqlparser.Sql):
         :return: All statements of SQL input.
         """
         if self._statements is None:
-            self._statements = self.get_statements()
+            if self._segments is not None:
+                self._statements = [s for statements in self._from_segments("get_statements") for s in statements]
+            else:
+                self._statements = self._cached("statements", (), lambda: self._native().get_statements())
         return self._statements
 
+    def apply_edit(self, start, end, new_text):
+        """
+        Replace the characters start:end of the SQL text by new_text and update the parse
+        incrementally: only the statements touched by the edit are split and parsed again,
+        the others keep their results and only move, so statements, items and
+        typed_statements of the edited text cost one parse per changed statement.
+        Limitation: AST, format and tokens describe the whole text and are computed by a
+        native parse of the whole edited text on their first call after an edit, so their
+        cost is proportional to the text, not to the edit; they are the same as for a new
+        Sql object of that text.
+        :param start: start offset of the replaced text
+        :param end: end offset of the replaced text
+        :param new_text: replacement text
+        :return: EditResult(index, removed, inserted): removed statements starting at index
+                 were replaced by inserted new ones
+        """
+        if self._segments is None:
+            self._segmentize()
+        text, self._segments, result = incremental.apply_edit(
+            self._source[0], self._segments, start, end, new_text)
+        self._source = (text, None) + self._source[2:]
+        self._args = (text, False, self._source[3], self._source[2])
+        self._sql = None
+        self._items = None
+        self._statements = None
+        # The disk cache is keyed by the original text.
+        self._cache = None
+        return result
+
+    def _segmentize(self):
+        text, file = self._source[0], self._source[1]
+        if text is None:
+            with open(file, encoding="utf-8") as fp:
+                text = fp.read()
+            self._source = (text, None) + self._source[2:]
+        segments = incremental.segments(text)
+        statements, items = self.statements, self.items
+        # Reuse the results of the whole-text parse for the split statements with the
+        # same text; the native split may differ, e.g. around comments or blocks.
+        if len(statements) == len(segments) == len(items):
+            for segment, statement, item in zip(segments, statements, items):
+                if _statement_text(statement) == segment.text:
+                    segment.results[("get_statements",)] = [statement]
+                    segment.results[("get_items",)] = [item]
+        self._segments = segments
+
+    def _from_segments(self, method, *args):
+        """
+        Call a method of the native Sql object of every statement, parsing statements
+        on first use and reusing earlier results.
+        :return: list of results, one per statement
+        """
+        key = (method,) + args
+        name, pure = self._source[2], self._source[3]
+        out = []
+        for segment in self._segments:
+            value = segment.results.get(key, _missing)
+            if value is _missing:
+                if segment.native is None:
+                    segment.native = pysqlparser.Sql(segment.text, False, pure, name)
+                value = segment.results[key] = getattr(segment.native, method)(*args)
+            out.append(value)
+        return out
+
+    @property
+    def strings(self):
+        """
+        Get the intern table shared by the statement objects of this Sql object, so equal
+        names in their attributes are stored once.
+        :return: pysqlparse.interning.InternTable
+        """
+        if self._strings is None:
+            self._strings = interning.InternTable()
+        return self._strings
+
+    @strings.setter
+    def strings(self, table):
+        self._strings = table
+
+    def typed_statements(self):
+        """
+        Get the statements as wrapper objects of their statement type (Query, Insert, View,
+        Cte, Update, Delete, TableDDL), built from the items of this parse without parsing
+        the statements again. Items of other statement types are returned as they are.
+        With a cache, the statement objects are cached in their to_bytes() form and restored
+        without parsing, unless the input holds statements of other types.
+        :return: list of statement objects
+        """
+        if self._cache is None or self._segments is not None:
+            return self._typed_statements()
+        args = (self._source[2], self._source[3])
+        blobs = self._cache.get_value(self._digest, "Sql.typed_statements", args)
+        if blobs is not None:
+            typed = [serial.restore(data) for data in blobs]
+            for stmt in typed:
+                stmt._strings = self.strings
+            return typed
+        typed = self._typed_statements()
+        try:
+            blobs = [stmt.to_bytes() for stmt in typed]
+        except (AttributeError, serial.SerializationError):
+            return typed
+        self._cache.put_value(self._digest, "Sql.typed_statements", args, blobs)
+        return typed
+
+    def _typed_statements(self):
+        from pysqlparse import statement
+        sql_name, pure = self._source[2], self._source[3]
+        typed = []
+        for item in self.items:
+            name = _TYPED_STATEMENTS.get(item.__class__.__name__)
+            if name:
+                item = getattr(statement, name)._from_native(item)
+                item._strings = self.strings
+                if name == "Query":
+                    item._parse_args = (sql_name, pure)
+                elif name in _LEVEL_KINDS.values():
+                    item._parse_args = (pure,)
+            typed.append(item)
+        return typed
+
+    @classmethod
+    def split(cls, sql_statements, name="", pure=False, level="full", strings=None):
+        """
+        Split SQL text into statements and wrap each one in the class of its statement
+        type, without the native Sql parse. The statement type is found from the leading
+        keywords, and with level "lexical" or "dependencies" no statement is parsed until
+        an attribute beyond raw, kind and dependencies is read.
+        :param sql_statements: SQL statement string, or a UTF-8 buffer (bytes, mmap, ...)
+        :param name: Name for the parsed queries
+        :param pure: Whether to ignore comments
+        :param level: parse level: "lexical", "dependencies", "clauses" or "full".
+                      Update, Delete and TableDDL statements have no dependencies and
+                      are kept at the lexical level for "dependencies".
+        :param strings: intern table shared by the statements (default: a new table)
+        :return: list of statement objects; statements of other types are returned as text.
+                 The offset attribute of every statement object is its position in the input,
+                 which is also the base of its spans()
+        """
+        from pysqlparse import statement as wrappers
+        strings = strings if strings is not None else interning.InternTable()
+        typed = []
+        for start, _, text in splitter.split_statements(as_text(sql_statements)):
+            kind = lexer.statement_kind(text)
+            if kind == "query":
+                stmt = wrappers.Query(text, name, pure, level=level)
+            elif kind in _LEVEL_KINDS:
+                stmt = getattr(wrappers, _LEVEL_KINDS[kind])(text, pure, level=level)
+            elif kind in _PLAIN_KINDS:
+                klass = getattr(wrappers, _PLAIN_KINDS[kind])
+                if level == "clauses" or level == "full":
+                    stmt = klass(text)
+                else:
+                    stmt = klass.__new__(klass)
+                    stmt._bind_level(text, "lexical", {})
+            else:
+                typed.append(text)
+                continue
+            stmt.offset = start
+            stmt._strings = strings
+            typed.append(stmt)
+        return typed
+
+    def spans(self):
+        """
+        Get the (start, end) character offsets of the statements in the input,
+        for slicing the input instead of copying the statement texts.
+        Use pysqlparse.utils.byte_spans for offsets in the UTF-8 encoded input.
+        :return: list of (start, end) per statement, None for a statement whose tokens
+                 do not occur in the input after the previous statement, see utils.locate
+        """
+        if self._segments is not None:
+            return [(segment.start, segment.end) for segment in self._segments]
+        text, file = self._source[0], self._source[1]
+        if text is None:
+            with open(file, encoding="utf-8") as fp:
+                text = fp.read()
+        return utils.locate(text, list(self.statements), ordered=True)
+
+    def _cached(self, kind, args, func):
+        """
+        Return func(), from the disk cache of the object when possible.
+        :param kind: result kind, part of the cache key
+        :param args: arguments the result depends on
+        :param func: function computing the result on a miss
+        """
+        if self._cache is None:
+            return func()
+        args = (self._source[2], self._source[3]) + args
+        value = self._cache.get_value(self._digest, "Sql." + kind, args, _missing)
+        if value is _missing:
+            value = func()
+            self._cache.put_value(self._digest, "Sql." + kind, args, value)
+        return value
+
     def AST(self):
         """
         Get and return Sql AST with json string
         :return: sql AST json string
         """
-        return super(Sql, self).AST()
+        return self._cached("AST", (), lambda: profiler.call("ast", "sql", self._native().AST))
+
+    def ast_object(self):
+        """
+        Get and return Sql AST as Python objects instead of a json string
+        :return: root AstNode, child objects and arrays are AstNode and AstList views
+        """
+        return tree.loads(self.AST())
 
     def format(self, indent=DEFAULT_FORMAT_INDENT*' '):
         """
         :param indent: indent
         :return: sql statements after format
         """
-        return super(Sql, self).format(indent)
+        return self._cached("format", (indent,),
+                            lambda: profiler.call("format", "sql", self._native().format, indent))
+
+    def format_to(self, fp, indent=DEFAULT_FORMAT_INDENT*' '):
+        """
+        Format the statements one by one and write them to a file or stream, so the
+        formatted text of all statements is never held in memory at once.
+        Every statement is written terminated by ';' and followed by a blank line.
+        :param fp: text file object or stream with a write method
+        :param indent: indent
+        :return: number of statements written
+        """
+        count = 0
+        for statement in self.statements:
+            _write_formatted(fp, statement, indent, self._source[3], count)
+            count += 1
+        return count
 
     def tokens(self):
         """
         return tokens of Statements
         """
-        return super(Sql, self).tokens()
+        return self._cached("tokens", (), lambda: profiler.call("tokens", "sql", self._native().tokens))
+
+    @classmethod
+    def iter_statements(cls, file, chunk_size=DEFAULT_CHUNK_SIZE, name="", pure=False):
+        """
+        Parse a SQL file statement by statement.
+        The file is read in chunks and every statement is parsed as soon as its end is found,
+        so memory stays bounded by the largest statement plus one chunk.
+        :param file: SQL file path, file object or mmap
+        :param chunk_size: number of characters read at a time
+        :param name: Name for the parsed content
+        :param pure: Whether to ignore comments
+        :return: generator of Sql objects, one per statement
+        """
+        if isinstance(file, (str, bytes, os.PathLike)):
+            with open(file, encoding="utf-8") as fp:
+                yield from cls.iter_statements(fp, chunk_size, name, pure)
+            return
+        for _, _, statement in splitter.iter_statements(splitter.read_chunks(file, chunk_size)):
+            yield cls(statement, name=name, pure=pure)
+
+    @classmethod
+    def aiter_statements(cls, file, chunk_size=DEFAULT_CHUNK_SIZE, name="", pure=False):
+        """
+        Async variant of iter_statements for use in asyncio code: reading, splitting and
+        parsing run on the internal executor of pysqlparse.aio, off the event loop.
+        Breaking off the iteration or cancelling the task stops reading the file.
+        :param file: SQL file path, file object or mmap
+        :param chunk_size: number of characters read at a time
+        :param name: Name for the parsed content
+        :param pure: Whether to ignore comments
+        :return: async iterator of Sql objects, one per statement
+        """
+        from pysqlparse import aio
+        return aio.aiterate(cls.iter_statements(file, chunk_size, name, pure))
+
+
+serial.register(Sql)
 
+
+def _statement_text(statement):
+    """Return a statement of the native split without surrounding whitespace and ';'."""
+    return statement.strip().rstrip(";").rstrip()
+
+
+def _terminated(formatted):
+    """Return a formatted statement ending with ';'."""
+    if not formatted.endswith(";"):
+        # A ';' after a trailing line comment would be commented out.
+        last = [t for t in lexer.scan(formatted) if t[0] != lexer.WHITESPACE][-1:]
+        line_comment = last and last[0][0] == lexer.COMMENT and formatted.startswith("--", last[0][1])
+        formatted += "\n;" if line_comment else ";"
+    return formatted
+
+
+def _write_formatted(fp, statement, indent, pure, index):
+    formatted = _terminated(pysqlparser.Sql(statement, False, pure, "").format(indent).strip())
+    fp.write(("\n" if index else "") + formatted + "\n")
+
+
+def format_file(src, dst, indent=DEFAULT_FORMAT_INDENT*' ', pure=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Format a SQL file statement by statement, writing the output incrementally.
+    The input is read in chunks and every statement is formatted and written as soon as
+    its end is found, so memory stays bounded by the largest statement plus one chunk.
+    :param src: SQL file path, file object or mmap
+    :param dst: output file path or text stream
+    :param indent: indent
+    :param pure: Whether to ignore comments
+    :param chunk_size: number of characters read at a time
+    :return: number of statements written
+    """
+    if isinstance(dst, (str, bytes, os.PathLike)):
+        with open(dst, "w", encoding="utf-8") as fp:
+            return format_file(src, fp, indent, pure, chunk_size)
+    if isinstance(src, (str, bytes, os.PathLike)):
+        with open(src, encoding="utf-8") as fp:
+            return format_file(fp, dst, indent, pure, chunk_size)
+    count = 0
+    for _, _, statement in splitter.iter_statements(splitter.read_chunks(src, chunk_size)):
+        _write_formatted(dst, statement, indent, pure, count)
+        count += 1
+    return count
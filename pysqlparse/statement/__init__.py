@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
-from pysqlparse.statement.cte import Cte
-from pysqlparse.statement.insert import Insert
-from pysqlparse.statement.query import Query
-from pysqlparse.statement.table_ddl import TableDDL
-from pysqlparse.statement.view import View
-from pysqlparse.statement.update import Update
-from pysqlparse.statement.delete import Delete
+from pysqlparse._lazy import attach as _attach
+
+# Statement classes and their modules, imported on first access.
+_MODULES = {
+    "Cte": "pysqlparse.statement.cte",
+    "Insert": "pysqlparse.statement.insert",
+    "Query": "pysqlparse.statement.query",
+    "TableDDL": "pysqlparse.statement.table_ddl",
+    "View": "pysqlparse.statement.view",
+    "Update": "pysqlparse.statement.update",
+    "Delete": "pysqlparse.statement.delete",
+}
 
 
 __all__ = (
@@ -17,3 +22,6 @@ __all__ = (
     "Update",
     "Delete"
 )
+
+
+__getattr__, __dir__ = _attach(globals(), _MODULES)
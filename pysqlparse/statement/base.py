@@ -0,0 +1,265 @@
+import functools
+
+import pysqlparse.pysqlparser as parser
+from pysqlparse import utils
+from pysqlparse import interning
+from pysqlparse import lexer
+from pysqlparse import profiler
+from pysqlparse import serial
+from pysqlparse.cache import cached_parse
+
+# Parse levels, from cheapest to complete. "lexical" and "dependencies" skip the native
+# parse; the native parser always builds every clause, so "clauses" is the same as "full".
+PARSE_LEVELS = ("lexical", "dependencies", "clauses", "full")
+
+
+class BaseStatement(object):
+    """
+    Common base of the statement wrapper classes.
+
+    The wrappers expose the fields of the native statement object (``__stmt__``)
+    listed in ``__attrs__``. Fields are resolved on first access and cached on the
+    instance, so constructing a wrapper costs about the same as the native parse call
+    and only the fields that are actually read get converted into Python objects.
+
+    Wrappers can be pickled and serialized with to_bytes()/from_bytes(). A restored
+    wrapper has all fields without parsing; the native statement is only rebuilt from
+    ``raw`` when one of ``__callables__`` (ast, format, tokens) is called.
+
+    Wrappers created with a parse level of "lexical" or "dependencies" work the same
+    way: only ``raw``, ``kind`` and, for "dependencies", ``dependencies`` are computed up
+    front, and the statement is parsed in full on first access to any other field.
+    """
+
+    __attrs__ = ()
+
+    __callables__ = ()
+
+    # Name of the pysqlparser function parsing this statement type.
+    __native__ = None
+
+    # InternTable shared with the Sql object or batch the statement belongs to.
+    _strings = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        serial.register(cls)
+
+    def __init__(self, stmt):
+        """
+        Bind the wrapper to a parsed native statement object.
+
+        Args:
+            stmt (object): The parsed native statement object.
+        """
+        self.__stmt__ = stmt
+        if profiler.enabled():
+            kind = self.__class__.__name__.lower()
+            for m in self.__callables__:
+                setattr(self, m, profiler.wrap(m, kind, getattr(stmt, m)))
+            return
+        for m in self.__callables__:
+            setattr(self, m, getattr(stmt, m))
+
+    def _parse(self, statement: str, cache, *args) -> bool:
+        """
+        Bind the wrapper to the parse of a statement by the ``__native__`` function,
+        restored from the disk cache when it holds the result.
+
+        Args:
+            statement (str): The statement text.
+            cache (DiskCache): Persistent parse cache, or None.
+            args: Further arguments of the native function; they are part of the cache key.
+
+        Returns:
+            bool: True if the wrapper was restored from the cache.
+        """
+        digest = cache.digest(statement) if cache is not None else None
+        if digest is not None and cache.restore(self, digest, args):
+            return True
+        BaseStatement.__init__(self, cached_parse(getattr(parser, self.__native__), statement, *args))
+        if digest is not None:
+            cache.store(self, digest, args)
+        return False
+
+    @classmethod
+    def _from_native(cls, stmt):
+        """
+        Wrap a native statement object parsed elsewhere, e.g. an item of pysqlparser.Sql.
+
+        Args:
+            stmt (object): The parsed native statement object of this statement type.
+        """
+        self = cls.__new__(cls)
+        BaseStatement.__init__(self, stmt)
+        return self
+
+    def _bind_level(self, statement: str, level: str, fields: dict) -> bool:
+        """
+        Bind the wrapper without the native parse if the parse level allows it.
+
+        Args:
+            statement (str): The statement text.
+            level (str): One of PARSE_LEVELS.
+            fields (dict): Further fields known without parsing, e.g. the name.
+
+        Returns:
+            bool: True if the wrapper was bound, False if the statement must be parsed now.
+
+        Raises:
+            ValueError: If level is unknown.
+        """
+        if level not in PARSE_LEVELS:
+            raise ValueError(f"unknown parse level: {level!r}, expected one of {PARSE_LEVELS}")
+        if level == "clauses" or level == "full":
+            return False
+        fields = dict(fields, raw=statement, kind=lexer.statement_kind(statement))
+        if level == "dependencies":
+            fields["dependencies"] = self._dependencies(statement)
+        self._restore_fields(fields)
+        return True
+
+    def _dependencies(self, statement: str):
+        """
+        Return the tables the statement reads from.
+
+        Raises:
+            ValueError: If the statement type does not support dependency extraction.
+        """
+        raise ValueError(f"{self.__class__.__name__} does not support the dependencies parse level")
+
+    def __getattr__(self, name: str):
+        """
+        Resolve a statement field on first access and cache it on the instance.
+
+        Only called when normal lookup fails, so cached fields never reach it again.
+        """
+        if name.startswith("__") or "__stmt__" not in self.__dict__:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        attr = self._intern(self._resolve(name))
+        self.__dict__[name] = attr
+        return attr
+
+    def _intern(self, value):
+        """Pass a resolved field through the intern table of the statement or the global one."""
+        table = self._strings if self._strings is not None else interning.global_table()
+        return table.intern(value) if table is not None else value
+
+    def _resolve(self, name: str):
+        """
+        Fetch a single field from the native statement object.
+
+        Args:
+            name (str): Field name, must be listed in ``__attrs__``.
+
+        Raises:
+            AttributeError: If the field is not exposed by this statement type.
+        """
+        if name == "kind":
+            return lexer.statement_kind(self.raw)
+        if name == "dependencies" and type(self)._dependencies is not BaseStatement._dependencies:
+            return self._dependencies(self.raw)
+        if name not in self.__attrs__:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        return getattr(self._native(), name)
+
+    def _native(self):
+        """
+        Return the native statement object, parsing ``raw`` again if the wrapper was
+        restored from serialized data.
+        """
+        stmt = self.__dict__["__stmt__"]
+        if stmt is None:
+            stmt = self.__dict__["__stmt__"] = self._reparse()
+        return stmt
+
+    def _reparse(self):
+        """Parse ``raw`` into a new native statement object."""
+        return profiler.call("parse", self.__native__, getattr(parser, self.__native__), self.raw,
+                             *self.__dict__.get("_parse_args", ()), source=self.raw)
+
+    def _call_native(self, method: str, *args, **kwargs):
+        bound = getattr(self._native(), method)
+        # Profiled wrappers stay in place so later calls are still reported.
+        if isinstance(self.__dict__.get(method), functools.partial):
+            setattr(self, method, bound)
+        return bound(*args, **kwargs)
+
+    def spans(self, name: str, drop: bool = False):
+        """
+        Return the offsets of a text attribute in the input instead of its text.
+
+        Every string of the attribute (a string, or a list or dict of strings such as
+        ``subquery`` or ``cte_map``) is replaced by its ``(start, end)`` character offsets,
+        relative to ``raw`` or, for statements from Sql.split, to the whole input. The
+        offsets are found by matching the tokens of the string against those of ``raw``,
+        see pysqlparse.utils.locate.
+        Use pysqlparse.utils.byte_spans for offsets in the UTF-8 encoded input.
+
+        Args:
+            name (str): The attribute name, e.g. "clause_from" or "subquery".
+            drop (bool): Release the text of the attribute afterwards, so only the offsets
+                are kept; reading the attribute again converts it again.
+
+        Returns:
+            The attribute with ``(start, end)`` in place of every string, None for text
+            whose tokens do not occur in ``raw`` (e.g. normalized by the parser).
+        """
+        spans = utils.locate(self.raw, getattr(self, name), self.__dict__.get("offset", 0))
+        if drop and name != "raw":
+            self.__dict__.pop(name, None)
+        return spans
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the parsed statement into a compact, versioned binary form.
+
+        All fields are resolved first, so restoring with from_bytes() does not parse.
+
+        Returns:
+            bytes: The serialized statement.
+
+        Raises:
+            pysqlparse.serial.SerializationError: If a field holds a value that cannot be serialized.
+        """
+        fields = {name: getattr(self, name) for name in self.__attrs__}
+        for name, value in self.__dict__.items():
+            if name != "__stmt__" and name != "_strings" and name not in self.__callables__:
+                fields[name] = value
+        return serial.dumps(self.__class__.__name__, fields)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Restore a statement serialized with to_bytes(), without parsing it.
+
+        Args:
+            data (bytes): The serialized statement.
+
+        Raises:
+            pysqlparse.serial.SerializationError: If data is malformed, of another format
+                version or of another statement type.
+        """
+        cls_name, fields = serial.loads(data)
+        klass = serial.statement_class(cls_name)
+        if not issubclass(klass, cls):
+            raise serial.SerializationError(f"data holds a {cls_name}, not a {cls.__name__}")
+        return klass._from_fields(fields)
+
+    @classmethod
+    def _from_fields(cls, fields: dict):
+        self = cls.__new__(cls)
+        self._restore_fields(fields)
+        return self
+
+    def _restore_fields(self, fields: dict):
+        self.__dict__.update(fields)
+        self.__dict__["__stmt__"] = None
+        profiled = profiler.enabled()
+        kind = self.__class__.__name__.lower()
+        for m in self.__callables__:
+            call = functools.partial(self._call_native, m)
+            setattr(self, m, profiler.wrap(m, kind, call) if profiled else call)
+
+    def __reduce__(self):
+        return serial.restore, (self.to_bytes(),)
@@ -1,10 +1,14 @@
-from typing import List, Tuple
+from typing import List, Tuple, Any, Optional
 
 from pysqlparse.conf import DEFAULT_FORMAT_INDENT
 import pysqlparse.pysqlparser as parser
+from pysqlparse.cache import cached_parse, DiskCache
+from pysqlparse.statement.base import BaseStatement
+from pysqlparse.utils import as_text
+from pysqlparse import tree
 
 
-class Cte(object):
+class Cte(BaseStatement):
     """
     Common Table Expression (CTE) parser and manipulation class.
 
@@ -34,18 +38,27 @@ class Cte(object):
         "format"
     )
 
+    __native__ = "cte"
+
+    name = "WITH"
+
     def __init__(
             self,
             statement: str,
             pure: bool = False,
-            name: str = None
+            name: str = None,
+            cache: Optional[DiskCache] = None,
+            level: str = "full"
     ):
+        statement = as_text(statement)
+        self._parse_args = (pure,)
+        if self._bind_level(statement, level, {}):
+            return
+        self._parse(statement, cache, pure)
         self.name = None or "WITH"
-        self.__stmt__ = parser.cte(statement, pure)
-        for m in Cte.__callables__:
-            setattr(self, m, getattr(self.__stmt__, m))
-        for n in Cte.__attrs__:
-            setattr(self, n, getattr(self.__stmt__, n))
+
+    def _dependencies(self, statement: str) -> List[str]:
+        return list(cached_parse(parser.parse_dependence, statement, by_shape=True))
 
     def __repr__(self) -> str:
         """Official string representation showing class and CTE identifier."""
@@ -81,6 +94,16 @@ class Cte(object):
         """
         pass
 
+    def ast_object(self) -> Any:
+        """
+        Generate the abstract syntax tree (AST) of the CTE structure as Python objects.
+
+        Returns:
+            AstNode root whose fields hold child AstNode and AstList views and scalars,
+            following the same schema as the JSON string returned by ast()
+        """
+        return tree.loads(self.ast())
+
     @classmethod
     def tokenize(cls, statement: str) -> List[Tuple[str, str, str]]:
         """
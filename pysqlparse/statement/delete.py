@@ -1,9 +1,12 @@
-from typing import Tuple, List, Any
+from typing import Tuple, List, Any, Optional
 
 import pysqlparse.pysqlparser as parser
+from pysqlparse.cache import DiskCache
+from pysqlparse.statement.base import BaseStatement
+from pysqlparse.utils import as_text
 
 
-class Delete(object):
+class Delete(BaseStatement):
     """
     A SQL DELETE statement parser and analyzer.
 
@@ -24,20 +27,19 @@ class Delete(object):
         "tokens",
     )
 
-    def __init__(self, statement: str):
+    __native__ = "delete"
+
+    def __init__(self, statement: str, cache: Optional[DiskCache] = None):
         """
         Initialize a Delete instance by parsing an SQL DELETE statement.
 
         Args:
             statement: Complete SQL DELETE statement to parse
                      Example: "DELETE FROM employees WHERE status = 'inactive'"
+            cache: Optional persistent parse cache (pysqlparse.DiskCache), a hit skips parsing.
         """
-        self.name = ""
-        self.__stmt__ = parser.delete(statement)
-        for m in Delete.__callables__:
-            setattr(self, m, getattr(self.__stmt__, m))
-        for n in Delete.__attrs__:
-            setattr(self, n, getattr(self.__stmt__, n))
+        statement = as_text(statement)
+        self._parse(statement, cache)
 
     def __repr__(self) -> str:
         """Official string representation of the Delete instance."""
@@ -1,10 +1,17 @@
-from typing import List, Any, Tuple
+import re
+from array import array
+from typing import List, Any, Tuple, Iterator, Dict, Optional
 
 import pysqlparse.pysqlparser as parser
 from pysqlparse.conf import DEFAULT_FORMAT_INDENT
+from pysqlparse.cache import cached_parse, DiskCache
+from pysqlparse.statement.base import BaseStatement
+from pysqlparse.utils import as_text
+from pysqlparse import tree
+from pysqlparse import lexer
 
 
-class Insert(object):
+class Insert(BaseStatement):
     """
     A SQL INSERT statement parser and structured representation.
 
@@ -39,7 +46,13 @@ class Insert(object):
         "tokens"
     )
 
-    def __init__(self, statement: str, pure: bool = False):
+    __native__ = "insert"
+
+    _stmt = ""
+    _head = ""
+
+    def __init__(self, statement: str, pure: bool = False, cache: Optional[DiskCache] = None,
+                 level: str = "full"):
         """
         Initialize an Insert instance by parsing an SQL INSERT statement.
 
@@ -50,25 +63,145 @@ class Insert(object):
                        "INSERT INTO t1 SELECT * FROM t2"
             pure: If True, strips comments and non-essential elements during parsing.
                   Default False preserves original SQL structure.
+            cache: Optional persistent parse cache (pysqlparse.DiskCache), a hit skips parsing.
+            level: Parse level, one of "lexical" (raw and kind only), "dependencies" (also
+                   the tables read by the statement), "clauses" or "full". At the first two
+                   levels the statement is parsed in full on first access to any other attribute.
 
         Raises:
             SQLSyntaxError: For malformed INSERT statements
             ParserError: For unsupported INSERT variants
         """
-        self.__stmt__ = parser.insert(statement, pure)
-        self.name = ""
-        for m in Insert.__callables__:
-            setattr(self, m, getattr(self.__stmt__, m))
-        for name in Insert.__attrs__:
-            attr = getattr(self.__stmt__, name)
-            setattr(self, name, attr)
+        statement = as_text(statement)
+        self._parse_args = (pure,)
+        if self._bind_level(statement, level, {}):
+            return
+        self._parse(statement, cache, pure)
         self._stmt = ""
         self._head = ""
 
+    def _dependencies(self, statement: str) -> List[str]:
+        """Tables read by the SELECT part, found without parsing the INSERT itself."""
+        insert = lexer.find_keyword(statement, ("INSERT",))
+        if insert is None:
+            return []
+        select = lexer.find_keyword(statement, ("SELECT", "WITH"), insert[1])
+        if select is None:
+            return []
+        # A WITH clause in front of INSERT belongs to the SELECT part.
+        query = statement[:insert[0]] + statement[select[0]:]
+        return list(cached_parse(parser.parse_dependence, query, by_shape=True))
+
     def __repr__(self) -> str:
         """Official string representation showing class and target table."""
         return repr(f"<class {self.__class__.__name__} name='{self.name}'>")
 
+    def iter_rows(self) -> Iterator[List[str]]:
+        """
+        Lazily iterate over the rows of a multi-row INSERT ... VALUES statement.
+
+        Rows are read from the statement text one at a time, so the ``values``
+        attribute is never materialized.
+
+        Yields:
+            One list per row, holding the SQL text of each value (e.g. "1", "'a'", "NOW()")
+        """
+        raw = self.raw
+        tokens = lexer.scan(raw)
+        depth = 0
+        for t, start, end in tokens:
+            if t == lexer.PUNCTUATION:
+                if raw[start] == "(":
+                    depth += 1
+                elif raw[start] == ")":
+                    depth -= 1
+            elif depth == 0 and t in (lexer.KEYWORD, lexer.IDENTIFIER) and raw[start:end].upper() in ("VALUES", "VALUE"):
+                break
+        else:
+            return
+
+        row = None
+        cell_start = cell_end = -1
+        for t, start, end in tokens:
+            if t == lexer.WHITESPACE or t == lexer.COMMENT:
+                continue
+            char = raw[start] if t == lexer.PUNCTUATION else None
+            if depth == 0:
+                if char == "(":
+                    depth = 1
+                    row = []
+                    cell_start = -1
+                elif char != ",":
+                    break
+                continue
+            if depth == 1 and (char == "," or char == ")"):
+                row.append(raw[cell_start:cell_end] if cell_start >= 0 else "")
+                cell_start = -1
+                if char == ")":
+                    depth = 0
+                    yield row
+                continue
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            if cell_start < 0:
+                cell_start = start
+            cell_end = end
+
+    def values_columnar(self, numeric: bool = False) -> Dict[Any, Any]:
+        """
+        Collect the rows of a multi-row INSERT ... VALUES statement column by column.
+
+        Args:
+            numeric: If True, columns whose values are all int64 integer literals become
+                     array('q') and columns of numeric literals become array('d')
+                     (NULL as NaN); both support the buffer protocol, e.g.
+                     numpy.frombuffer(column, numpy.float64). Other columns stay
+                     lists of value texts.
+
+        Returns:
+            Dict mapping each column name (from ``columns``, or the column position
+            when the statement lists no columns) to its values in row order. A numeric
+            column that meets a non-numeric value holds the original value texts.
+        """
+        data = None
+        # Columns that turned out not to be numeric -> number of rows whose texts are missing.
+        restore = {}
+        for n, row in enumerate(self.iter_rows()):
+            if data is None:
+                data = [array("q") if numeric else [] for _ in row]
+            elif len(row) != len(data):
+                raise ValueError(f"row with {len(row)} values, expected {len(data)}")
+            for i, cell in enumerate(row):
+                column = data[i]
+                if isinstance(column, list):
+                    column.append(cell)
+                    continue
+                column = _append_number(column, cell)
+                if column is None:
+                    restore[i] = n
+                    column = [cell]
+                data[i] = column
+        if restore:
+            # Read the texts of the rows before each downgrade again instead of
+            # rendering the numbers already parsed back to text.
+            heads = {i: [] for i in restore}
+            last = max(restore.values())
+            for n, row in enumerate(self.iter_rows()):
+                if n >= last:
+                    break
+                for i, stop in restore.items():
+                    if n < stop:
+                        heads[i].append(row[i])
+            for i, head in heads.items():
+                data[i] = head + data[i]
+        data = data or []
+        names = list(self.columns or ()) or list(range(len(data)))
+        if len(names) < len(data):
+            names.extend(range(len(names), len(data)))
+        return dict(zip(names, data))
+
     def format(self, indent: str = DEFAULT_FORMAT_INDENT*' ', init_indent: int = 0) -> str:
         """
         Generate a consistently formatted version of the INSERT statement.
@@ -100,6 +233,16 @@ class Insert(object):
         """
         pass
 
+    def ast_object(self) -> Any:
+        """
+        Generate the abstract syntax tree (AST) of the INSERT statement as Python objects.
+
+        Returns:
+            AstNode root whose fields hold child AstNode and AstList views and scalars,
+            following the same schema as the JSON string returned by ast()
+        """
+        return tree.loads(self.ast())
+
     def tokens(self) -> List[Any]:
         """
         Retrieve lexical tokens from the parsed statement.
@@ -128,3 +271,30 @@ class Insert(object):
         Useful for quick analysis without full parsing overhead.
         """
         return parser.Insert.tokenize(statement)
+
+
+_INTEGER = re.compile(r"[+-]?\d+\Z")
+_DECIMAL = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\Z")
+
+
+def _append_number(column: array, cell: str) -> Optional[array]:
+    """
+    Append a value text to a numeric column, widening array('q') to array('d') for
+    decimal literals, NULL and integers out of the int64 range. Return the column to
+    keep using, or None if the value is not a numeric literal.
+    """
+    if column.typecode == "q":
+        if _INTEGER.match(cell):
+            try:
+                column.append(int(cell))
+                return column
+            except OverflowError:
+                pass
+        column = array("d", column)
+    if cell.upper() == "NULL":
+        column.append(float("nan"))
+        return column
+    if _DECIMAL.match(cell):
+        column.append(float(cell))
+        return column
+    return None
@@ -1,14 +1,19 @@
-from typing import List, Any, Tuple
+from typing import List, Any, Tuple, Optional
 from pysqlparse import pysqlparser as parser
+from pysqlparse.cache import cached_parse, cached_value, DiskCache
+from pysqlparse.statement.base import BaseStatement
+from pysqlparse.utils import as_text
+from pysqlparse import profiler
+from pysqlparse import tree
 
 
-class Query(object):
+class Query(BaseStatement):
     """
     Query class is used to parse and process SQL queries.
 
-    This class initializes its attributes by parsing SQL content and provides some methods
-    to handle and format SQL queries. It uses the pysqlparser library to parse SQL statements
-    and initializes the class attributes based on the parsed results.
+    This class parses SQL content and provides some methods to handle and format SQL queries.
+    It uses the pysqlparser library to parse SQL statements; the class attributes are
+    resolved from the parsed results on first access.
     """
     __attrs__ = (
         "name",
@@ -38,53 +43,69 @@ class Query(object):
         "tokens"
     )
 
-    def __init__(self, statement: str, name: str, pure: bool = False):
+    __native__ = "query"
+
+    _columns = None
+
+    def __init__(self, statement: str, name: str, pure: bool = False, cache: Optional[DiskCache] = None,
+                 level: str = "full"):
         """
         Initialize the Query object.
 
+        Attributes are resolved from the parsed statement on first access.
+
         Args:
-            statement (str): The SQL content to be parsed.
+            statement (str): The SQL content to be parsed, str or UTF-8 buffer (bytes, mmap, ...).
             name (str): The name associated with the SQL query.
             pure (bool): Parse SQL without note
+            cache (DiskCache): Optional persistent parse cache, a hit skips parsing.
+            level (str): Parse level, one of "lexical" (raw and kind only), "dependencies"
+                (also the dependencies), "clauses" or "full". At the first two levels the
+                statement is parsed in full on first access to any other attribute.
         """
-        self.__stmt__ = parser.query(statement, name, pure)
-        self.unions = []
+        statement = as_text(statement)
+        self._parse_args = (name, pure)
+        if self._bind_level(statement, level, {"name": name}):
+            return
+        self._parse(statement, cache, name, pure)
         self._columns = None
-        self.cte = None
-        self.__init_items(self.__stmt__)
 
-    def __init_items(self, stmt):
+    def _resolve(self, name: str):
         """
-        Initialize the attributes and methods of the Query object based on the parsed statement.
+        Resolve an attribute of the Query object from the parsed statement.
+
+        ``cte`` maps every CTE name to its statement and ``unions`` interleaves the
+        union statements with the union keys; both are built from the raw fields.
 
         Args:
-            stmt (object): The parsed SQL statement object.
-        """
-        for m in Query.__callables__:
-            setattr(self, m, getattr(stmt, m))
-        for name in Query.__attrs__:
-            attr = getattr(stmt, name)
-            if name == "cte_names":
-                if not attr:
-                    continue
-                self.cte = dict()
-                for n in attr:
-                    self.cte[n] = getattr(stmt, "cte_map")[n]
-                continue
-            if name == "union_keys":
-                if not attr:
-                    continue
-                for i, it in enumerate(attr):
-                    self.unions.append(getattr(stmt, "union_stmt")[i])
-                    self.unions.append(it)
-                self.unions.append(getattr(stmt, "union_stmt")[-1])
-                break
-            if name == "union_stmt" or name == "cte_map":
-                continue
-            if name == "columns":
-                setattr(self, "_columns", attr)
-                continue
-            setattr(self, name, attr)
+            name (str): The attribute name.
+        """
+        if name == "cte":
+            cte_names = self.cte_names
+            if not cte_names:
+                return None
+            cte_map = self.cte_map
+            return {n: cte_map[n] for n in cte_names}
+        if name == "unions":
+            unions = []
+            union_keys = self.union_keys
+            if not union_keys:
+                return unions
+            union_stmt = self.union_stmt
+            for i, it in enumerate(union_keys):
+                unions.append(union_stmt[i])
+                unions.append(it)
+            unions.append(union_stmt[-1])
+            return unions
+        return super(Query, self)._resolve(name)
+
+    def _reparse(self):
+        """Parse ``raw`` into a new native statement object."""
+        return profiler.call("parse", "query", parser.query, self.raw,
+                             *self.__dict__.get("_parse_args", (self.name, False)), source=self.raw)
+
+    def _dependencies(self, statement: str) -> List[str]:
+        return Query.parse_dependence(statement)
 
     @property
     def columns(self):
@@ -94,20 +115,25 @@ class Query(object):
         Returns:
             list: The list of columns in the SQL query.
         """
+        if self._columns is None:
+            self._columns = self._intern(self._resolve("columns"))
         return self._columns
 
     @staticmethod
-    def parse_dependence(statement: str) -> List[str]:
+    def parse_dependence(statement: str, cache: Optional[DiskCache] = None) -> List[str]:
         """
         Parse the dependencies of the SQL statement.
 
         Args:
             statement (str): The SQL statement to parse.
+            cache (DiskCache): Optional persistent parse cache, a hit skips parsing.
 
         Returns:
             list: A list of dependencies.
         """
-        return parser.parse_dependence(statement)
+        statement = as_text(statement)
+        return cached_value(cache, "parse_dependence", statement, (),
+                            lambda: list(cached_parse(parser.parse_dependence, statement, by_shape=True)))
 
     def format(self, indent: str = "    ", init_indent: int = 0) -> str:
         """
@@ -131,6 +157,15 @@ class Query(object):
         """
         pass
 
+    def ast_object(self) -> Any:
+        """
+        Generate the AST of the SQL query as Python objects instead of a JSON string.
+
+        Returns:
+            AstNode: The root node; child objects and arrays are AstNode and AstList views.
+        """
+        return tree.loads(self.ast())
+
     def tokens(self) -> List[Any]:
         """
         Get the tokens.
@@ -1,7 +1,13 @@
+from typing import Any, Optional
+
 import pysqlparse.pysqlparser as parser
+from pysqlparse.cache import DiskCache
+from pysqlparse.statement.base import BaseStatement
+from pysqlparse.utils import as_text
+from pysqlparse import tree
 
 
-class TableDDL(object):
+class TableDDL(BaseStatement):
     """
     A SQL CREATE TABLE statement parser and structured representation.
 
@@ -28,20 +34,19 @@ class TableDDL(object):
         "ast",
     )
 
-    def __init__(self, statement: str):
+    __native__ = "create"
+
+    def __init__(self, statement: str, cache: Optional[DiskCache] = None):
         """
         Initialize a TableDDL instance by parsing a CREATE TABLE statement.
 
         Args:
             statement: Complete SQL CREATE TABLE statement to parse
                      Example: "CREATE TABLE employees (id INT PRIMARY KEY, name VARCHAR(100))"
+            cache: Optional persistent parse cache (pysqlparse.DiskCache), a hit skips parsing.
         """
-        self.name = ""
-        self.__stmt__ = parser.create(statement)
-        for m in TableDDL.__callables__:
-            setattr(self, m, getattr(self.__stmt__, m))
-        for n in TableDDL.__attrs__:
-            setattr(self, n, getattr(self.__stmt__, n))
+        statement = as_text(statement)
+        self._parse(statement, cache)
 
     def __repr__(self) -> str:
         """Official string representation of the TableDDL instance."""
@@ -59,3 +64,13 @@ class TableDDL(object):
             - Partitioning and table options if specified
         """
         pass
+
+    def ast_object(self) -> Any:
+        """
+        Generate the abstract syntax tree (AST) of the table definition as Python objects.
+
+        Returns:
+            AstNode root whose fields hold child AstNode and AstList views and scalars,
+            following the same schema as the JSON string returned by ast()
+        """
+        return tree.loads(self.ast())
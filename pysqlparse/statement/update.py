@@ -1,9 +1,12 @@
-from typing import Tuple, List, Any
+from typing import Tuple, List, Any, Optional
 
 import pysqlparse.pysqlparser as parser
+from pysqlparse.cache import DiskCache
+from pysqlparse.statement.base import BaseStatement
+from pysqlparse.utils import as_text
 
 
-class Update(object):
+class Update(BaseStatement):
     """
     A SQL UPDATE statement parser and analyzer.
 
@@ -32,23 +35,22 @@ class Update(object):
         "tokens",
     )
 
-    def __init__(self, statement: str):
+    __native__ = "update"
+
+    def __init__(self, statement: str, cache: Optional[DiskCache] = None):
         """
         Initialize an Update instance by parsing an SQL UPDATE statement.
 
         Args:
             statement: Complete SQL UPDATE statement to parse
                      Example: "UPDATE table SET col1=val1 WHERE condition"
+            cache: Optional persistent parse cache (pysqlparse.DiskCache), a hit skips parsing.
 
         Raises:
             SQLSyntaxError: If the input is not a valid UPDATE statement
         """
-        self.name = ""
-        self.__stmt__ = parser.update(statement)
-        for m in Update.__callables__:
-            setattr(self, m, getattr(self.__stmt__, m))
-        for n in Update.__attrs__:
-            setattr(self, n, getattr(self.__stmt__, n))
+        statement = as_text(statement)
+        self._parse(statement, cache)
 
     def __repr__(self) -> str:
         """Official string representation of the Update instance."""
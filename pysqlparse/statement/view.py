@@ -1,9 +1,14 @@
-from typing import List, Any, Tuple
+from typing import List, Any, Tuple, Optional
 import pysqlparse.pysqlparser as parser
 from pysqlparse.conf import DEFAULT_FORMAT_INDENT
+from pysqlparse.cache import cached_parse, DiskCache
+from pysqlparse.statement.base import BaseStatement
+from pysqlparse.utils import as_text
+from pysqlparse import lexer
+from pysqlparse import tree
 
 
-class View(object):
+class View(BaseStatement):
     """
     A SQL View parser and representation class.
 
@@ -29,7 +34,10 @@ class View(object):
         "tokens"
     )
 
-    def __init__(self, statement: str, pure: bool = False):
+    __native__ = "view"
+
+    def __init__(self, statement: str, pure: bool = False, cache: Optional[DiskCache] = None,
+                 level: str = "full"):
         """
         Initialize a View instance by parsing SQL CREATE VIEW statement.
 
@@ -38,16 +46,27 @@ class View(object):
                        Example: 'CREATE VIEW v1 AS SELECT * FROM employees'
             pure: If True, strips comments and non-essential elements during parsing.
                   If False (default), preserves original SQL structure including comments.
+            cache: Optional persistent parse cache (pysqlparse.DiskCache), a hit skips parsing.
+            level: Parse level, one of "lexical" (raw and kind only), "dependencies" (also
+                   the tables read by the statement), "clauses" or "full". At the first two
+                   levels the statement is parsed in full on first access to any other attribute.
 
         Raises:
             SQLSyntaxError: If input is not a valid CREATE VIEW statement
         """
-        self.name = ""
-        self.__stmt__ = parser.view(statement, pure)
-        for m in View.__callables__:
-            setattr(self, m, getattr(self.__stmt__, m))
-        for n in View.__attrs__:
-            setattr(self, n, getattr(self.__stmt__, n))
+        statement = as_text(statement)
+        self._parse_args = (pure,)
+        if self._bind_level(statement, level, {}):
+            return
+        self._parse(statement, cache, pure)
+
+    def _dependencies(self, statement: str) -> List[str]:
+        """Tables read by the view query, found without parsing the view definition."""
+        view = lexer.find_keyword(statement, ("VIEW",))
+        start = lexer.find_keyword(statement, ("AS",), view[1]) if view is not None else None
+        if start is None:
+            return []
+        return list(cached_parse(parser.parse_dependence, statement[start[1]:], by_shape=True))
 
     def __repr__(self) -> str:
         """Machine-readable string representation of the View instance."""
@@ -82,6 +101,16 @@ class View(object):
         """
         pass
 
+    def ast_object(self) -> Any:
+        """
+        Generate the abstract syntax tree (AST) of the view as Python objects.
+
+        Returns:
+            AstNode root whose fields hold child AstNode and AstList views and scalars,
+            following the same schema as the JSON string returned by ast()
+        """
+        return tree.loads(self.ast())
+
     def tokens(self) -> List[Any]:
         """
         Extract lexical tokens from the view definition.
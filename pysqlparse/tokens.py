@@ -0,0 +1,159 @@
+"""
+Compact, array-backed token streams.
+"""
+from array import array
+from collections import namedtuple
+from typing import Iterable, List
+
+from pysqlparse import lexer
+
+
+TokenInfo = namedtuple("TokenInfo", ("type", "text", "start", "end"))
+
+TokenBatch = namedtuple("TokenBatch", ("type_codes", "offsets", "row_splits"))
+
+
+class TokenStream(object):
+    """
+    Tokens of a statement stored in contiguous arrays.
+
+    ``type_codes`` holds one unsigned byte per token (index into lexer.TOKEN_TYPES)
+    and ``offsets`` holds ``start, end`` pairs of signed 64-bit offsets into the source,
+    character offsets for str sources and byte offsets for bytes/buffer sources.
+    Both support the buffer protocol, e.g. ``numpy.frombuffer(stream.type_codes, numpy.uint8)``;
+    ``offsets_view()`` returns the offsets as an (n, 2) memoryview.
+    Token text is only sliced out of the source when a token is indexed.
+    """
+
+    __slots__ = ("source", "type_codes", "offsets")
+
+    def __init__(self, source, type_codes: array, offsets: array):
+        self.source = source
+        self.type_codes = type_codes
+        self.offsets = offsets
+
+    @classmethod
+    def from_statement(cls, statement, skip_whitespace: bool = True) -> "TokenStream":
+        """
+        Tokenize a statement into a TokenStream.
+
+        Args:
+            statement: SQL statement, str or UTF-8 bytes/buffer object
+            skip_whitespace: Leave whitespace tokens out of the stream
+
+        Returns:
+            TokenStream over statement
+        """
+        type_codes = array("B")
+        offsets = array("q")
+        add_type = type_codes.append
+        add_offsets = offsets.extend
+        for t, start, end in lexer.scan(statement):
+            if skip_whitespace and t == lexer.WHITESPACE:
+                continue
+            add_type(t)
+            add_offsets((start, end))
+        return cls(statement, type_codes, offsets)
+
+    def __len__(self) -> int:
+        return len(self.type_codes)
+
+    def __getitem__(self, i: int) -> TokenInfo:
+        if isinstance(i, slice):
+            raise TypeError("TokenStream indices must be integers")
+        t = self.type_codes[i]
+        if i < 0:
+            i += len(self.type_codes)
+        start = self.offsets[2 * i]
+        end = self.offsets[2 * i + 1]
+        return TokenInfo(lexer.TOKEN_TYPES[t], self.source[start:end], start, end)
+
+    def __iter__(self):
+        for i in range(len(self.type_codes)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} tokens={len(self)}>"
+
+    def offsets_view(self) -> memoryview:
+        """Return the offsets as a read-only memoryview of shape (n, 2), or an empty view."""
+        view = memoryview(self.offsets).toreadonly()
+        if not self.type_codes:
+            return view
+        return view.cast("B").cast("q", (len(self.type_codes), 2))
+
+    def type_counts(self) -> List[int]:
+        """Return the number of tokens of every type, indexed like lexer.TOKEN_TYPES."""
+        return [self.type_codes.count(t) for t in range(len(lexer.TOKEN_TYPES))]
+
+
+def token_stream(statement, skip_whitespace: bool = True) -> TokenStream:
+    """
+    Tokenize a statement into a compact TokenStream.
+
+    The tokens come from the Python-side lexer (pysqlparse.lexer), not from the native
+    tokenize() of the statement classes, so token boundaries and types may differ from
+    those of the extension.
+
+    Args:
+        statement: SQL statement, str or UTF-8 bytes/buffer object
+        skip_whitespace: Leave whitespace tokens out of the stream
+    """
+    return TokenStream.from_statement(statement, skip_whitespace)
+
+
+def tokenize_batch(statements: Iterable, skip_whitespace: bool = True) -> TokenBatch:
+    """
+    Tokenize many statements into one set of flat arrays (ragged layout).
+
+    The tokens of statement i are ``row_splits[i]:row_splits[i + 1]`` of ``type_codes``
+    (one unsigned byte per token, index into lexer.TOKEN_TYPES) and ``offsets`` holds
+    ``start, end`` pairs relative to each statement. All three arrays support the buffer
+    protocol, e.g. ``numpy.frombuffer(batch.type_codes, numpy.uint8)`` and
+    ``numpy.frombuffer(batch.offsets, numpy.int64).reshape(-1, 2)`` without copying.
+
+    Args:
+        statements: SQL statements, str or UTF-8 bytes/buffer objects
+        skip_whitespace: Leave whitespace tokens out
+
+    Returns:
+        TokenBatch(type_codes, offsets, row_splits)
+    """
+    type_codes = array("B")
+    offsets = array("q")
+    row_splits = array("q", [0])
+    add_type = type_codes.append
+    add_offsets = offsets.extend
+    add_split = row_splits.append
+    whitespace = lexer.WHITESPACE
+    for statement in statements:
+        for t, start, end in lexer.scan(statement):
+            if skip_whitespace and t == whitespace:
+                continue
+            add_type(t)
+            add_offsets((start, end))
+        add_split(len(type_codes))
+    return TokenBatch(type_codes, offsets, row_splits)
+
+
+def type_count_matrix(batch: TokenBatch) -> memoryview:
+    """
+    Count the tokens of every type per statement of a tokenize_batch result.
+
+    Counting runs on the type code bytes (bytes.count), one row at a time.
+
+    Returns:
+        Read-only int64 memoryview of shape (statements, len(lexer.TOKEN_TYPES)),
+        e.g. ``numpy.asarray(type_count_matrix(batch))``; an empty flat view for no statements
+    """
+    codes = batch.type_codes.tobytes()
+    needles = [bytes((t,)) for t in range(len(lexer.TOKEN_TYPES))]
+    splits = batch.row_splits
+    counts = array("q")
+    for i in range(len(splits) - 1):
+        start, end = splits[i], splits[i + 1]
+        counts.extend([codes.count(needle, start, end) for needle in needles])
+    view = memoryview(counts).toreadonly()
+    if not counts:
+        return view
+    return view.cast("B").cast("q", (len(splits) - 1, len(needles)))
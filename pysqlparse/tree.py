@@ -0,0 +1,138 @@
+"""
+Python object representation of the abstract syntax tree.
+
+The AST JSON is decoded once with the C decoder of json.loads; AstNode and AstList are
+thin views over the decoded dicts and lists, created only for the nodes that are
+actually visited. Building the view costs no more than json.loads of the string.
+"""
+import json
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, Tuple
+
+
+class AstNode(object):
+    """
+    An AST node, a read-only view of one JSON object of the AST.
+
+    Fields are read as attributes (``node.type``) or items (``node["type"]``). Child
+    objects and arrays are returned as AstNode and AstList views, created on access.
+    """
+
+    __slots__ = ("_fields",)
+
+    def __init__(self, fields: Dict[str, Any]):
+        self._fields = fields
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return _view(self._fields[name])
+        except KeyError:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'") from None
+
+    def __getitem__(self, key: str) -> Any:
+        return _view(self._fields[key])
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, AstNode):
+            return NotImplemented
+        return self._fields == other._fields
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.items())
+        return f"AstNode({fields})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the field value, or default if the node has no such field."""
+        return _view(self._fields[key]) if key in self._fields else default
+
+    def keys(self):
+        """Return the field names."""
+        return self._fields.keys()
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over (field name, value) pairs."""
+        return ((k, _view(v)) for k, v in self._fields.items())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the node and its descendants to new plain dicts and lists."""
+        return _copy(self._fields)
+
+
+class AstList(Sequence):
+    """A read-only view of a JSON array of the AST; objects in it are returned as AstNode."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: list):
+        self._items = items
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return AstList(self._items[i])
+        return _view(self._items[i])
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, AstList):
+            return self._items == other._items
+        if isinstance(other, list):
+            return self._items == _copy(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"AstList({list(self)!r})"
+
+    def to_list(self) -> list:
+        """Convert the list and its descendants to new plain lists and dicts."""
+        return _copy(self._items)
+
+
+def _view(value: Any) -> Any:
+    if isinstance(value, dict):
+        return AstNode(value)
+    if isinstance(value, list):
+        return AstList(value)
+    return value
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    if isinstance(value, (AstNode, AstList)):
+        return value.to_dict() if isinstance(value, AstNode) else value.to_list()
+    return value
+
+
+def loads(ast_json: str) -> Any:
+    """
+    Decode an AST JSON string into AstNode views.
+
+    The string is decoded by json.loads without a Python callback per object; nodes are
+    wrapped when they are accessed.
+
+    Args:
+        ast_json: JSON string as returned by the ast()/AST() methods
+
+    Returns:
+        AstNode for a JSON object, AstList for a JSON array
+    """
+    return _view(json.loads(ast_json))
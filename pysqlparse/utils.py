@@ -0,0 +1,163 @@
+"""
+Helpers shared by the Sql and statement wrappers.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pysqlparse import lexer
+
+Span = Tuple[int, int]
+
+
+def as_text(statement) -> str:
+    """
+    Return the statement as str.
+
+    Besides str, accepts bytes, bytearray, mmap.mmap, memoryview or any other object
+    supporting the buffer protocol, holding UTF-8 encoded SQL. The buffer is decoded
+    in place, without an intermediate bytes copy.
+
+    Args:
+        statement: SQL statement as str or buffer object
+
+    Raises:
+        TypeError: If statement is neither str nor a buffer object
+    """
+    if isinstance(statement, str):
+        return statement
+    try:
+        view = memoryview(statement)
+    except TypeError:
+        raise TypeError(f"expected str or buffer object, got {type(statement).__name__}") from None
+    with view:
+        return str(view, "utf-8")
+
+
+class _TokenIndex(object):
+    """
+    The significant tokens of a text (no whitespace or comments) with their parenthesis
+    depth, for finding the token sequence of a string in it.
+    """
+
+    def __init__(self, raw: str):
+        self.spans = []
+        self.keys = []
+        # Parenthesis depth before and after every token.
+        self.before = []
+        self.after = []
+        self.positions = {}
+        depth = 0
+        for i, (key, start, end) in enumerate(_significant(raw)):
+            self.spans.append((start, end))
+            self.keys.append(key)
+            self.before.append(depth)
+            if key == "(":
+                depth += 1
+            elif key == ")":
+                depth -= 1
+            self.after.append(depth)
+            self.positions.setdefault(key, []).append(i)
+
+    def matches(self, keys: List[str], complete: bool) -> List[Tuple[int, int]]:
+        """
+        Return the token ranges [i, j) holding keys that are balanced in parentheses,
+        outermost first. With complete, only ranges ending where a query ends (at the end
+        of the text, before ')' or ';', or before a set operator) are returned.
+        """
+        found = []
+        k = len(keys)
+        n = len(self.keys)
+        for i in self.positions.get(keys[0], ()):
+            j = i + k
+            if j > n or self.keys[i:j] != keys:
+                continue
+            depth = self.before[i]
+            if self.after[j - 1] != depth or min(self.after[i:j]) < depth:
+                continue
+            if complete and j < n and self.keys[j] not in _QUERY_END:
+                continue
+            found.append((depth, i, j))
+        found.sort()
+        return [(i, j) for _, i, j in found]
+
+
+# Tokens after which a query that does not run to the end of the text ends.
+_QUERY_END = frozenset((")", ";", "UNION", "INTERSECT", "EXCEPT", "MINUS"))
+
+
+def _significant(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield (comparison key, start, end) of the tokens of text that are not whitespace or comments."""
+    for t, start, end in lexer.scan(text):
+        if t == lexer.WHITESPACE or t == lexer.COMMENT:
+            continue
+        yield (text[start:end].upper() if t == lexer.KEYWORD else text[start:end]), start, end
+
+
+def locate(raw: str, value: Any, offset: int = 0, ordered: bool = False) -> Any:
+    """
+    Replace every string in value by its (start, end) offsets in raw.
+
+    Strings are found structurally: raw and the string are scanned with
+    pysqlparse.lexer and the string must match a sequence of whole tokens of raw
+    (ignoring whitespace, comments and keyword case) that is balanced in parentheses.
+    A string starting with SELECT or WITH must also match a complete query, so a
+    subquery is never located in the prefix of the enclosing statement. Of several
+    matches the outermost one is used, then the first one not used by an equal string
+    before.
+
+    Args:
+        raw: Text the strings were taken from
+        value: A string, or a list, tuple or dict of them (nested), None or other values
+               are returned as they are
+        offset: Added to every offset, e.g. the position of raw in a larger input
+        ordered: The strings are consecutive parts of raw in order (e.g. statements of a
+                 script); every string is then matched after the previous one
+
+    Returns:
+        value with (start, end) tuples in place of the strings; None for strings that do
+        not match a token sequence of raw (e.g. text normalized by the parser)
+    """
+    return _locate(_TokenIndex(raw), value, offset, ordered, {}, [0])
+
+
+def _locate(index: _TokenIndex, value: Any, offset: int, ordered: bool, used: Dict[str, set], cursor: List[int]) -> Any:
+    if isinstance(value, str):
+        keys = [key for key, _, _ in _significant(value)]
+        if not keys:
+            return None
+        matches = index.matches(keys, keys[0] in ("SELECT", "WITH"))
+        if ordered:
+            matches = sorted(m for m in matches if m[0] >= cursor[0])[:1]
+        if not matches:
+            return None
+        taken = used.setdefault(value, set())
+        i, j = next((m for m in matches if m[0] not in taken), matches[0])
+        taken.add(i)
+        cursor[0] = j
+        return offset + index.spans[i][0], offset + index.spans[j - 1][1]
+    if isinstance(value, (list, tuple)):
+        return [_locate(index, v, offset, ordered, used, cursor) for v in value]
+    if isinstance(value, dict):
+        return {k: _locate(index, v, offset, ordered, used, cursor) for k, v in value.items()}
+    return value
+
+
+def byte_spans(text: str, spans: Iterable[Optional[Span]]) -> List[Optional[Span]]:
+    """
+    Convert character offsets in text to offsets in its UTF-8 encoding.
+
+    Args:
+        text: The text the offsets refer to
+        spans: (start, end) character offsets or None
+
+    Returns:
+        The same spans as UTF-8 byte offsets, for slicing the encoded buffer
+    """
+    spans = list(spans)
+    positions = sorted({p for span in spans if span is not None for p in span})
+    mapping = {}
+    prev = size = 0
+    for p in positions:
+        size += len(text[prev:p].encode("utf-8", "surrogatepass"))
+        mapping[p] = size
+        prev = p
+    return [None if span is None else (mapping[span[0]], mapping[span[1]]) for span in spans]
@@ -0,0 +1,143 @@
+import os
+
+import pytest
+
+from pysqlparse import cache
+from pysqlparse.cache import DiskCache, ParseCache
+
+
+class Recorder(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, statement, *args):
+        self.calls.append(statement)
+        return statement.upper()
+
+
+def files(path, suffix):
+    return [os.path.join(root, name) for root, _, names in os.walk(path) for name in names if name.endswith(suffix)]
+
+
+def test_lru_evicts_least_recently_used():
+    func = Recorder()
+    c = ParseCache(max_entries=2)
+    c.parse(func, "a")
+    c.parse(func, "b")
+    c.parse(func, "a")
+    c.parse(func, "c")
+    assert c.parse(func, "a") == "A"
+    assert func.calls == ["a", "b", "c"]
+    c.parse(func, "b")
+    assert func.calls == ["a", "b", "c", "b"]
+    info = c.info()
+    assert (info.hits, info.misses, info.entries) == (2, 4, 2)
+    assert info.evictions == 2
+
+
+def test_lru_max_bytes_counts_utf8_bytes():
+    func = Recorder()
+    c = ParseCache(max_bytes=6)
+    c.parse(func, "ééé")
+    assert c.info().bytes == 6
+    c.parse(func, "a")
+    assert c.info().entries == 1
+    assert c.info().evictions == 1
+    c.parse(func, "ééé")
+    c.parse(func, "aaaaaaa")
+    assert c.info().entries == 1
+    c.parse(func, "aaaaaaa")
+    assert func.calls.count("aaaaaaa") == 2
+
+
+def test_lru_arguments_are_part_of_the_key():
+    func = Recorder()
+    c = ParseCache()
+    c.parse(func, "a", 1)
+    c.parse(func, "a", 2)
+    c.parse(func, "a", 1)
+    assert func.calls == ["a", "a"]
+
+
+def test_fingerprint_key_shares_results_by_shape():
+    func = Recorder()
+    c = ParseCache(key="fingerprint")
+    c.parse(func, "select * from t where a = 1", by_shape=True)
+    c.parse(func, "select *  from t  where a = 2 -- c", by_shape=True)
+    assert len(func.calls) == 1
+    c.parse(func, "select * from t where a = 1")
+    c.parse(func, "select * from t where a = 2")
+    assert len(func.calls) == 3
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        ParseCache(key="hash")
+    with pytest.raises(ValueError):
+        ParseCache(max_entries=0)
+    with pytest.raises(ValueError):
+        DiskCache("unused", max_bytes=0)
+
+
+def test_disk_cache_round_trip(tmp_path):
+    c = DiskCache(tmp_path)
+    digest = DiskCache.digest("select 1")
+    assert c.get(digest, "Query") is None
+    c.put(digest, "Query", (), b"payload")
+    assert c.get(digest, "Query") == b"payload"
+    assert c.get(digest, "Query", ("name",)) is None
+    assert c.get(digest, "Insert") is None
+    assert (c.hits, c.misses) == (1, 3)
+    c.put_value(digest, "dependencies", (), ["t", "u"])
+    assert c.get_value(digest, "dependencies") == ["t", "u"]
+    assert c.get_value(digest, "format", default="x") == "x"
+
+
+def test_disk_cache_writes_are_atomic(tmp_path, monkeypatch):
+    c = DiskCache(tmp_path)
+    digest = DiskCache.digest("select 1")
+    c.put(digest, "Query", (), b"old")
+    c.put(digest, "Query", (), b"new")
+    assert c.get(digest, "Query") == b"new"
+    assert len(files(tmp_path, DiskCache._suffix)) == 1
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache.os, "replace", fail)
+    c.put(digest, "Query", (), b"lost")
+    assert c.get(digest, "Query") == b"new"
+    assert files(tmp_path, ".tmp") == []
+
+
+def test_disk_cache_key_includes_environment(tmp_path, monkeypatch):
+    c = DiskCache(tmp_path)
+    digest = DiskCache.digest("select 1")
+    c.put(digest, "Query", (), b"payload")
+    monkeypatch.setattr(cache, "environment", lambda: "other")
+    assert c.get(digest, "Query") is None
+
+
+def test_disk_cache_evicts_oldest_entries(tmp_path):
+    c = DiskCache(tmp_path, max_bytes=100)
+    digests = [DiskCache.digest(f"select {i}") for i in range(4)]
+    for i, digest in enumerate(digests[:3]):
+        c.put(digest, "Query", (), bytes(30))
+        os.utime(c._file(digest, "Query", ()), (i, i))
+    c.get(digests[0], "Query")
+    c.put(digests[3], "Query", (), bytes(30))
+    assert c.get(digests[1], "Query") is None
+    assert c.get(digests[0], "Query") is not None
+    assert c.get(digests[3], "Query") is not None
+    info = c.info()
+    assert info.evictions >= 1
+    assert info.bytes <= 90
+
+
+def test_disk_cache_clear(tmp_path):
+    c = DiskCache(tmp_path)
+    c.put(DiskCache.digest("select 1"), "Query", (), b"payload")
+    c.clear()
+    assert c.info().entries == 0
+    assert files(tmp_path, DiskCache._suffix) == []
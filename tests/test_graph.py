@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("pysqlparse.pysqlparser")
+
+from pysqlparse import graph  # noqa: E402
+from pysqlparse.graph import DependencyGraph  # noqa: E402
+
+
+def parse_definition(sql, kind=None):
+    # "<kind> <name> <dependencies...>", so the tests do not depend on the parser.
+    words = sql.split()
+    return (None if words[1] == "-" else words[1]), words[2:]
+
+
+@pytest.fixture
+def g(monkeypatch):
+    monkeypatch.setattr(graph, "parse_definition", parse_definition)
+    monkeypatch.setattr(graph, "detect_kind", lambda sql: sql.split()[0])
+    return DependencyGraph()
+
+
+def test_topological_order(g):
+    g.add(None, "view report daily users")
+    g.add(None, "insert daily events")
+    g.add(None, "view users raw_users")
+    order = g.topological_order()
+    assert sorted(order) == ["daily", "events", "raw_users", "report", "users"]
+    for node in order:
+        assert all(order.index(d) < order.index(node) for d in g.dependencies(node))
+    assert order == ["events", "raw_users", "daily", "users", "report"]
+
+
+def test_topological_order_detects_cycles(g):
+    g.add(None, "view a b")
+    g.add(None, "view b c")
+    g.add(None, "view c a")
+    g.add(None, "view d e")
+    with pytest.raises(ValueError, match="a, b, c"):
+        g.topological_order()
+    g.remove("c")
+    assert g.topological_order() == ["c", "e", "b", "d", "a"]
+
+
+def test_inserts_into_one_target_union_dependencies(g):
+    g.add(None, "insert t a")
+    g.add(None, "insert t b")
+    assert g.dependencies("t") == {"a", "b"}
+    assert g.definition("t") == "insert t a;\ninsert t b"
+    assert g.update("t", "insert t a") is True
+    assert g.dependencies("t") == {"a"} and g.dependents("b") == set()
+    g.add(None, "view t c")
+    assert g.dependencies("t") == {"c"}
+
+
+def test_upstream_and_downstream(g):
+    g.add(None, "view b a")
+    g.add(None, "view c b")
+    g.add("q", "query - c a")
+    assert g.upstream("q") == {"a", "b", "c"}
+    assert g.downstream("a") == {"b", "c", "q"}
+    assert "a" in g and len(g) == 4
+    with pytest.raises(ValueError):
+        g.add(None, "query - a")
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from pysqlparse.incremental import EditResult, apply_edit, segments
+
+
+DOC = """SELECT 1;
+INSERT INTO t VALUES ('a;b');
+SELECT 'x' FROM u; -- c
+UPDATE t SET a = 1;
+DELETE FROM t"""
+
+
+def spans(segs):
+    return [(s.start, s.end, s.text) for s in segs]
+
+
+def edit(text, start, end, new_text):
+    segs = segments(text)
+    for seg in segs:
+        seg.results["mark"] = seg.text
+    document, new, result = apply_edit(text, segs, start, end, new_text)
+    assert document == text[:start] + new_text + text[end:]
+    assert spans(new) == spans(segments(document))
+    return segs, new, result
+
+
+def test_edit_inside_one_statement():
+    starts = [s.start for s in segments(DOC)]
+    old, new, result = edit(DOC, DOC.index("'x'") + 1, DOC.index("'x'") + 2, "yy")
+    assert result == EditResult(2, 1, 1)
+    assert new[2].text == "SELECT 'yy' FROM u"
+    assert new[2].results == {}
+    assert [new[j] is old[j] for j in (0, 1, 3, 4)] == [True] * 4
+    assert new[3].start == starts[3] + 1
+
+
+def test_edit_splitting_and_joining_statements():
+    _, new, result = edit(DOC, DOC.index("FROM u"), DOC.index("FROM u"), "; SELECT 2 ")
+    assert result == EditResult(2, 1, 2)
+    assert new[3].text == "SELECT 2 FROM u"
+    semi = DOC.index(";", DOC.index("SELECT 'x'"))
+    _, new, result = edit(DOC, semi, semi + 1, "")
+    assert result.index == 2 and result.removed >= 2 and result.inserted == 1
+
+
+def test_edit_inside_string_literal():
+    pos = DOC.index("a;b") + 1
+    _, new, result = edit(DOC, pos, pos + 1, "")
+    assert result == EditResult(1, 1, 1)
+    assert new[1].text == "INSERT INTO t VALUES ('ab')"
+
+
+def test_unclosed_quote_or_comment_reaches_the_end():
+    _, new, result = edit(DOC, 0, 0, "$$")
+    assert len(new) == 1 and result == EditResult(0, 5, 1)
+    _, new, _ = edit(DOC, 0, 0, "/*")
+    assert new == []
+
+
+def test_unchanged_statements_keep_their_results():
+    text = "SELECT 1; SELECT 1; SELECT 2"
+    old, new, _ = edit(text, 0, len("SELECT 1;"), "SELECT 3;")
+    assert new[0].results == {}
+    assert new[1] is old[1] and new[1].results == {"mark": "SELECT 1"}
+
+
+def test_random_edits_match_a_full_split():
+    rng = random.Random(7)
+    pieces = ["SELECT 1", ";", " ", "'", "--", "\n", "/*", "*/", "x", "BEGIN", "END", "$$"]
+    text = DOC
+    segs = segments(text)
+    for _ in range(300):
+        start = rng.randint(0, len(text))
+        end = rng.randint(start, min(len(text), start + 5))
+        text, segs, _ = apply_edit(text, segs, start, end, rng.choice(pieces))
+        assert spans(segs) == spans(segments(text))
+
+
+def test_range_outside_the_document():
+    with pytest.raises(ValueError):
+        apply_edit(DOC, segments(DOC), 5, len(DOC) + 1, "")
+    with pytest.raises(ValueError):
+        apply_edit(DOC, segments(DOC), 5, 4, "")
@@ -0,0 +1,40 @@
+import math
+
+import pytest
+
+pytest.importorskip("pysqlparse.pysqlparser")
+
+from pysqlparse.statement import Insert  # noqa: E402
+
+
+def test_iter_rows():
+    insert = Insert("INSERT INTO t (a, b) VALUES (1, 'x, y'), (f(2, 3), (4)), (NULL, '')")
+    assert list(insert.iter_rows()) == [["1", "'x, y'"], ["f(2, 3)", "(4)"], ["NULL", "''"]]
+
+
+def test_values_columnar_as_texts():
+    insert = Insert("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')")
+    assert insert.values_columnar() == {"a": ["1", "2"], "b": ["'x'", "'y'"]}
+
+
+def test_values_columnar_numeric():
+    columns = Insert("INSERT INTO t (a, b) VALUES (1, 1), (-2, 2.5), (3, NULL)").values_columnar(numeric=True)
+    assert columns["a"].typecode == "q" and columns["a"].tolist() == [1, -2, 3]
+    assert columns["b"].typecode == "d"
+    assert columns["b"][:2].tolist() == [1.0, 2.5] and math.isnan(columns["b"][2])
+
+
+def test_values_columnar_falls_back_to_texts():
+    sql = "INSERT INTO t (a, b) VALUES (1, 1.5), (2, 'x'), (3, 2), (99999999999999999999, 3)"
+    columns = Insert(sql).values_columnar(numeric=True)
+    assert columns["b"] == ["1.5", "'x'", "2", "3"]
+    assert columns["a"].typecode == "d" and columns["a"].tolist() == [1.0, 2.0, 3.0, 1e20]
+
+
+def test_values_columnar_rejects_ragged_rows():
+    with pytest.raises(ValueError):
+        Insert("INSERT INTO t (a, b) VALUES (1, 2), (3)").values_columnar()
+
+
+def test_values_columnar_without_values():
+    assert Insert("INSERT INTO t (a, b) SELECT a, b FROM u").values_columnar() == {}
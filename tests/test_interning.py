@@ -0,0 +1,73 @@
+import sys
+import types
+
+from pysqlparse import interning
+from pysqlparse.interning import InternTable, memory_report
+
+
+def fresh(value):
+    # A str equal to value but not the same object.
+    return "".join(list(value))
+
+
+def test_equal_strings_share_one_object():
+    table = InternTable()
+    a = table.intern(fresh("orders"))
+    b = table.intern(fresh("orders"))
+    assert a is b
+    assert len(table) == 1
+    info = table.info()
+    assert (info.strings, info.requests, info.hits) == (1, 2, 1)
+    assert info.saved_bytes == sys.getsizeof(b)
+
+
+def test_containers():
+    table = InternTable()
+    name = table.intern(fresh("tab"))
+    items = [fresh("tab"), 1, None]
+    assert table.intern(items) is items
+    assert items[0] is name
+    assert table.intern((fresh("tab"), 2))[0] is name
+    mapping = table.intern({fresh("tab"): [fresh("tab")]})
+    assert next(iter(mapping)) is name and mapping[name][0] is name
+
+
+def test_long_strings_are_not_interned():
+    table = InternTable(max_length=4)
+    long = fresh("select")
+    assert table.intern(long) is long
+    assert len(table) == 0 and table.info().requests == 0
+
+
+def test_clear():
+    table = InternTable()
+    table.intern(fresh("tab"))
+    table.intern(fresh("tab"))
+    table.clear()
+    assert len(table) == 0
+    assert table.info() == (0, 0, 0, 0)
+
+
+def test_global_table():
+    try:
+        table = interning.enable_interning(8)
+        assert interning.global_table() is table and table.max_length == 8
+    finally:
+        interning.disable_interning()
+    assert interning.global_table() is None
+
+
+def test_memory_report_counts_duplicates():
+    a = types.SimpleNamespace(name=fresh("orders"), columns=[fresh("id"), fresh("id")])
+    b = types.SimpleNamespace(name=fresh("orders"), cte_map={fresh("x"): (fresh("id"),)})
+    report = memory_report([a, b])
+    assert report.references == 6
+    assert report.objects == 6
+    assert report.values == 3
+    assert report.duplicate_bytes == sys.getsizeof("orders") + 2 * sys.getsizeof("id")
+    table = InternTable()
+    for o in (a, b):
+        for key, value in vars(o).items():
+            setattr(o, key, table.intern(value))
+    report = memory_report([a, b])
+    assert (report.references, report.objects, report.duplicate_bytes) == (6, 3, 0)
@@ -0,0 +1,59 @@
+from pysqlparse import lexer
+from pysqlparse.lexer import fingerprint, shape
+
+
+def test_literals_and_formatting_share_a_fingerprint():
+    a = fingerprint("select a, b from T where x = 1 and y = 'it''s' -- comment")
+    b = fingerprint("SELECT a,b\n  FROM t WHERE x = 42 AND y = 'other'")
+    assert a == b
+    assert a.text == "SELECT a, b FROM t WHERE x = ? AND y = ?"
+
+
+def test_fingerprint_collapses_in_lists_and_values_rows():
+    assert fingerprint("select * from t where a in (1, 2, 3)").text == "SELECT * FROM t WHERE a IN (?)"
+    assert fingerprint("insert into t values (1, 'a'), (2, 'b')") == fingerprint("insert into t values (3, 'c')")
+    assert fingerprint("select * from t where a in (b, c)").text == "SELECT * FROM t WHERE a IN (b, c)"
+
+
+def test_fingerprint_signed_numbers_and_parameters():
+    assert fingerprint("select -1, a - 1, ? from t") == fingerprint("select 2, a - :p, %s from t")
+    assert fingerprint("select a - 1 from t") != fingerprint("select a, -1 from t")
+
+
+def test_fingerprint_keeps_names_apart():
+    assert fingerprint("select a from t") != fingerprint("select b from t")
+    assert fingerprint('select "A" from t') != fingerprint('select "a" from t')
+    assert fingerprint("select a from t;") == fingerprint("select a from t")
+
+
+def test_fingerprint_hash_is_stable():
+    assert fingerprint("select 1").hash == fingerprint("select 2").hash
+    assert 0 <= fingerprint("select 1").hash < 1 << 64
+
+
+def test_shape_keeps_case_and_values_rows():
+    assert shape("SELECT A  FROM t WHERE x = 1") == "SELECT A FROM t WHERE x = ?"
+    assert shape("INSERT INTO t VALUES (1), (2)") == "INSERT INTO t VALUES (?), (?)"
+    assert shape("SELECT * FROM t WHERE a IN (1, 2)") == "SELECT * FROM t WHERE a IN (?)"
+
+
+def test_scan_offsets_cover_the_input():
+    sql = "select 'a;b' /* c */ from t"
+    tokens = list(lexer.scan(sql))
+    assert tokens[0] == (lexer.KEYWORD, 0, 6)
+    assert "".join(sql[start:end] for _, start, end in tokens) == sql
+    assert [t for t, _, _ in tokens if t not in (lexer.WHITESPACE, lexer.COMMENT)] == [
+        lexer.KEYWORD, lexer.STRING, lexer.KEYWORD, lexer.IDENTIFIER]
+
+
+def test_scan_bytes_reports_byte_offsets():
+    sql = "select 'é', x from t"
+    tokens = list(lexer.scan(sql.encode("utf-8")))
+    assert tokens[2] == (lexer.STRING, 7, 11)
+
+
+def test_statement_kind():
+    assert lexer.statement_kind("  -- c\nSELECT 1") == "query"
+    assert lexer.statement_kind("with x as (select 1) select * from x") == "cte"
+    assert lexer.statement_kind("create or replace view v as select 1") == "view"
+    assert lexer.statement_kind("insert into t values (1)") == "insert"
@@ -0,0 +1,106 @@
+import sys
+import threading
+import types
+
+import pytest
+
+from pysqlparse import limits
+from pysqlparse.conf import DEFAULT_LIMITED_WORKERS
+from pysqlparse.limits import (CancelToken, LimitExceeded, Limits, ParseBusy, ParseCancelled, ParseTimeout,
+                               check, parse_limited, set_limited_workers)
+
+
+@pytest.fixture
+def parser(monkeypatch):
+    """Replace the parse behind parse_limited by one that blocks until released."""
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def parse_statement(statement, kind, pure):
+        started.release()
+        release.wait(10)
+        return (kind, statement)
+
+    monkeypatch.setitem(sys.modules, "pysqlparse.batch", types.SimpleNamespace(parse_statement=parse_statement))
+    yield release, started
+    release.set()
+    set_limited_workers(DEFAULT_LIMITED_WORKERS)
+
+
+def test_check_max_bytes_counts_utf8_bytes():
+    check("ééé", Limits(max_bytes=6))
+    with pytest.raises(LimitExceeded) as e:
+        check("éééé", Limits(max_bytes=6))
+    assert (e.value.limit, e.value.maximum) == ("max_bytes", 6)
+
+
+def test_check_max_tokens_ignores_whitespace_and_comments():
+    check("select a , b /* x y z */ from t -- u v w", Limits(max_tokens=6))
+    with pytest.raises(LimitExceeded) as e:
+        check("select a, b from t where c", Limits(max_tokens=6))
+    assert e.value.limit == "max_tokens"
+    check("select 'a b c d e f g h'", Limits(max_tokens=2))
+
+
+def test_check_max_depth_skips_quoted_parentheses():
+    check("select f(g(1)) from t where x = '((((' /* (((( */", Limits(max_depth=2))
+    with pytest.raises(LimitExceeded) as e:
+        check("select (((1)))", Limits(max_depth=2))
+    assert e.value.limit == "max_depth"
+
+
+def test_check_stops_on_cancel_and_deadline():
+    sql = "select " + ", ".join(["a"] * limits._CHECK_EVERY)
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(ParseCancelled):
+        check(sql, Limits(max_tokens=10 ** 6), token)
+    with pytest.raises(ParseTimeout):
+        check(sql, Limits(max_tokens=10 ** 6), deadline=0)
+
+
+def test_oversized_buffer_is_rejected_before_decoding(parser):
+    with pytest.raises(LimitExceeded):
+        parse_limited(b"\xff" * 10, max_bytes=4)
+
+
+def test_parse_without_deadline_runs_inline(parser):
+    release, _ = parser
+    release.set()
+    assert parse_limited("select 1", max_tokens=5) == ("query", "select 1")
+
+
+def test_timeout(parser):
+    with pytest.raises(ParseTimeout):
+        parse_limited("select 1", timeout_ms=20)
+    workers = [t for t in threading.enumerate() if t.name == "pysqlparse-limited"]
+    assert workers and all(t.daemon for t in workers)
+
+
+def test_cancel_wakes_up_the_waiting_parse(parser):
+    _, started = parser
+    token = CancelToken()
+
+    def cancel():
+        started.acquire(timeout=10)
+        token.cancel()
+
+    threading.Thread(target=cancel).start()
+    with pytest.raises(ParseCancelled):
+        parse_limited("select 1", cancel=token)
+    with pytest.raises(ParseCancelled):
+        parse_limited("select 1", cancel=token)
+
+
+def test_busy_workers_reject_new_parses(parser):
+    release, _ = parser
+    set_limited_workers(1)
+    with pytest.raises(ParseTimeout):
+        parse_limited("select 1", timeout_ms=10)
+    with pytest.raises(ParseBusy):
+        parse_limited("select 2", timeout_ms=10)
+    with pytest.raises(ValueError):
+        set_limited_workers(0)
+    set_limited_workers(1)
+    release.set()
+    assert parse_limited("select 3", timeout_ms=5000) == ("query", "select 3")
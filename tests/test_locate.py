@@ -0,0 +1,39 @@
+from pysqlparse.utils import locate
+
+
+def test_subquery_is_not_located_in_enclosing_statement():
+    raw = "select a from t where x in (select a from t)"
+    assert locate(raw, ["select a from t"]) == [(28, 43)]
+
+
+def test_strings_match_whole_tokens():
+    raw = "select a from t where x in (select a from t)"
+    assert locate(raw, "t") == (14, 15)
+    assert locate(raw, "a") == (7, 8)
+
+
+def test_repeated_strings_get_successive_matches():
+    assert locate("select * from t join t on 1", ["t", "t"]) == [(14, 15), (21, 22)]
+
+
+def test_whitespace_comments_and_keyword_case_are_ignored():
+    raw = "SELECT  a /* c */\n from  t"
+    assert locate(raw, "select a FROM t", 10) == (10, 36)
+
+
+def test_union_branches():
+    raw = "select a from t union select b from u"
+    assert locate(raw, ["select a from t", "select b from u"]) == [(0, 15), (22, 37)]
+
+
+def test_unbalanced_or_missing_text():
+    raw = "select f(a) from t"
+    assert locate(raw, "f(a") is None
+    assert locate(raw, "u") is None
+    assert locate(raw, None) is None
+
+
+def test_ordered_statements():
+    raw = "select 1; select 1; insert into t select 1"
+    assert locate(raw, ["select 1", "select 1", "insert into t select 1"], ordered=True) == [
+        (0, 8), (10, 18), (20, 42)]
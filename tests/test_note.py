@@ -0,0 +1,57 @@
+import io
+
+import pytest
+
+from pysqlparse.note import NoteStripper, iter_strip_note, strip_note_stream
+
+
+SQL = """-- header
+SELECT 'a--b', "c/*d", `e--f`, 'it''s -- no', 'back\\' /* no */' -- note
+FROM t /* block
+comment */ WHERE $body$ -- kept $body$ = $$ /* kept */ $$ AND a-1 > b/2; -- tail"""
+
+EXPECTED = (
+    "\n"
+    "SELECT 'a--b', \"c/*d\", `e--f`, 'it''s -- no', 'back\\' /* no */' \n"
+    "FROM t   WHERE $body$ -- kept $body$ = $$ /* kept */ $$ AND a-1 > b/2; "
+)
+
+
+def strip(sql, size):
+    return "".join(iter_strip_note(sql[i:i + size] for i in range(0, len(sql), size)))
+
+
+def test_strip_whole_input():
+    stripper = NoteStripper()
+    assert stripper.feed(SQL) + stripper.close() == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 16, 64])
+def test_chunk_size_does_not_change_the_result(size):
+    assert strip(SQL, size) == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 3, 64])
+def test_bytes_chunks(size):
+    data = (SQL + " -- é\nSELECT 'é'").encode("utf-8")
+    out = b"".join(iter_strip_note(data[i:i + size] for i in range(0, len(data), size)))
+    assert out == (EXPECTED + "\nSELECT 'é'").encode("utf-8")
+
+
+def test_unterminated_comment_is_dropped():
+    assert strip("select 1 /* open", 4) == "select 1 "
+    assert strip("select 1 -", 4) == "select 1 -"
+
+
+def test_stripper_is_reusable_after_close():
+    stripper = NoteStripper()
+    stripper.feed("select 1 /* open")
+    stripper.close()
+    assert stripper.feed("select 2 -- x") + stripper.close() == "select 2 "
+
+
+def test_strip_note_stream():
+    writer = io.StringIO()
+    written = strip_note_stream(io.StringIO(SQL), writer, chunk_size=5)
+    assert writer.getvalue() == EXPECTED
+    assert written == len(EXPECTED)
@@ -0,0 +1,81 @@
+import struct
+
+import pytest
+
+from pysqlparse import serial
+from pysqlparse.serial import FORMAT_VERSION, MAGIC, SerializationError, dumps, loads
+
+
+FIELDS = {
+    "raw": "select 'é', \ud800 from t",
+    "level": 0,
+    "big": -(1 << 100),
+    "ratio": 0.25,
+    "pure": False,
+    "query_load": True,
+    "name": None,
+    "data": b"\x00\xff",
+    "columns": ["a", ["b", ("c", 1)]],
+    "cte_map": {"x": {"y": []}, 1: ()},
+}
+
+
+def test_round_trip():
+    cls_name, fields = loads(dumps("Query", FIELDS))
+    assert cls_name == "Query"
+    assert fields == FIELDS
+    assert type(fields["columns"][1][1]) is tuple
+    assert fields["pure"] is False and fields["level"] == 0 and type(fields["level"]) is int
+
+
+def test_header():
+    data = dumps("Query", {})
+    assert data[:4] == MAGIC
+    assert struct.unpack_from("<H", data, 4)[0] == FORMAT_VERSION
+
+
+def test_version_mismatch():
+    data = bytearray(dumps("Query", FIELDS))
+    struct.pack_into("<H", data, 4, FORMAT_VERSION + 1)
+    with pytest.raises(SerializationError, match="format version"):
+        loads(data)
+
+
+def test_malformed_data():
+    data = dumps("Query", FIELDS)
+    with pytest.raises(SerializationError):
+        loads(b"XXXX" + data[4:])
+    with pytest.raises(SerializationError):
+        loads(data + b"N")
+    for end in range(len(data)):
+        with pytest.raises(SerializationError):
+            loads(data[:end])
+    tag = data.index(b"s", 12)
+    with pytest.raises(SerializationError):
+        loads(data[:tag] + b"?" + data[tag + 1:])
+    with pytest.raises(SerializationError, match="not a dict"):
+        loads(data[:8 + len("Query")] + b"N")
+
+
+def test_unsupported_values():
+    with pytest.raises(SerializationError):
+        dumps("Query", {"value": object()})
+    with pytest.raises(SerializationError):
+        dumps("Query", {"value": {1, 2}})
+
+
+def test_restore_registered_class(monkeypatch):
+
+    class Statement(object):
+
+        @classmethod
+        def _from_fields(cls, fields):
+            self = cls.__new__(cls)
+            self.__dict__.update(fields)
+            return self
+
+    monkeypatch.setitem(serial._classes, "Statement", Statement)
+    restored = serial.restore(dumps("Statement", {"raw": "select 1"}))
+    assert isinstance(restored, Statement) and restored.raw == "select 1"
+    with pytest.raises(SerializationError):
+        serial.statement_class("NoSuchStatement")
@@ -0,0 +1,126 @@
+import pytest
+
+from pysqlparse.splitter import StatementSplitter, iter_statements, split_statements
+
+
+def texts(sql):
+    return [text for _, _, text in split_statements(sql)]
+
+
+def chunked(sql, size):
+    return list(iter_statements(sql[i:i + size] for i in range(0, len(sql), size)))
+
+
+SCRIPT = """-- header comment
+SELECT 'a;b', "x;y", `c;d` FROM t; /* block ; comment */
+INSERT INTO t VALUES ('it''s;', 'back\\';slash');
+SELECT begin, end FROM events WHERE begin < 3;
+CREATE TABLE e (id INT, begin DATE, end DATE);
+CREATE TRIGGER tr BEFORE INSERT ON t FOR EACH ROW
+BEGIN
+  IF NEW.a > 0 THEN SET NEW.b = 1; END IF;
+  SELECT CASE WHEN x THEN 1 ELSE 2 END INTO @v;
+  CASE y WHEN 1 THEN SET @z = 1; END CASE;
+  WHILE i < 3 DO SET i = i + 1; END WHILE;
+END;
+BEGIN TRANSACTION;
+BEGIN;
+CREATE FUNCTION f() RETURNS int AS $body$ select 1; select 2; $body$ LANGUAGE sql;
+SELECT t.end, t.begin FROM t;
+-- only a comment;
+SELECT $$a;b$$ ;
+select 1 -- trailing ; comment
+"""
+
+
+def test_offsets_match_text():
+    statements = split_statements(SCRIPT)
+    assert len(statements) == 11
+    for start, end, text in statements:
+        assert SCRIPT[start:end] == text
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 16, 64, 1 << 20])
+def test_chunk_size_does_not_change_result(size):
+    assert chunked(SCRIPT, size) == split_statements(SCRIPT)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT begin FROM t; SELECT 2; SELECT 3",
+    "CREATE TABLE e (id INT, begin DATE); SELECT 1; SELECT 2",
+    "SELECT a FROM t WHERE begin > 1 AND x = 2; SELECT 1; SELECT 2",
+    "UPDATE t SET begin = 1; SELECT 1; SELECT 2",
+    "SELECT CASE WHEN x THEN begin ELSE 0 END FROM t; SELECT 1; SELECT 2",
+    "CREATE FUNCTION f(begin INT) RETURNS INT RETURN begin; SELECT 1; SELECT 2",
+])
+def test_begin_identifier_does_not_open_block(sql):
+    assert len(texts(sql)) == 3
+
+
+def test_begin_identifier_keeps_memory_bounded():
+    sql = "SELECT begin FROM t;\n" * 1000
+    splitter = StatementSplitter()
+    count = 0
+    for i in range(0, len(sql), 100):
+        count += len(splitter.feed(sql[i:i + 100]))
+        assert len(splitter._buf) < 200
+    count += len(splitter.close())
+    assert count == 1000
+
+
+@pytest.mark.parametrize("sql", [
+    "BEGIN; SELECT 1; COMMIT",
+    "BEGIN TRANSACTION; SELECT 1; COMMIT",
+    "BEGIN WORK; SELECT 1; COMMIT",
+    "BEGIN ISOLATION LEVEL SERIALIZABLE; SELECT 1; COMMIT",
+])
+def test_transactions(sql):
+    assert len(texts(sql)) == 3
+
+
+@pytest.mark.parametrize("body", [
+    "CREATE PROCEDURE p() BEGIN SELECT 1; SELECT 2; END",
+    "CREATE PROCEDURE p AS BEGIN SELECT 1; SELECT 2; END",
+    "CREATE OR REPLACE PROCEDURE p IS BEGIN NULL; NULL; END",
+    "CREATE FUNCTION f() RETURNS INT BEGIN DECLARE x INT; RETURN 1; END",
+    "CREATE FUNCTION f() RETURNS INT DETERMINISTIC BEGIN DECLARE x INT; RETURN 1; END",
+    "CREATE FUNCTION f() RETURNS DECIMAL(10, 2) READS SQL DATA BEGIN RETURN 1; END",
+    "CREATE DEFINER=`root`@`%` PROCEDURE p() COMMENT 'x' BEGIN SELECT 1; END",
+    "CREATE TRIGGER tr AFTER INSERT ON t BEGIN UPDATE u SET a = 1; DELETE FROM v; END",
+    "CREATE TRIGGER tr AFTER UPDATE OF begin ON t BEGIN SELECT 1; END",
+    "CREATE EVENT e ON SCHEDULE EVERY 1 DAY DO BEGIN DELETE FROM t; DELETE FROM u; END",
+    "/* routine */ CREATE PROCEDURE p() BEGIN SELECT begin FROM t; END",
+    "BEGIN SELECT 1; SELECT 2; END",
+])
+def test_routine_bodies(body):
+    assert texts(body + "; SELECT 1") == [body, "SELECT 1"]
+
+
+def test_nested_blocks():
+    body = """CREATE PROCEDURE p()
+BEGIN
+  DECLARE i INT;
+  IF i > 0 THEN
+    BEGIN
+      SELECT begin FROM t;
+      lbl: BEGIN SELECT 2; END;
+    END;
+  ELSE BEGIN SELECT 3; END;
+  END IF;
+  REPEAT SET i = i + 1; UNTIL i > 3 END REPEAT;
+  LOOP LEAVE; END LOOP;
+  CASE i WHEN 1 THEN BEGIN SELECT 4; END; ELSE SELECT 5; END CASE;
+END"""
+    sql = body + ";\nSELECT 1;"
+    assert texts(sql) == [body, "SELECT 1"]
+    for size in (1, 3, 17):
+        assert chunked(sql, size) == split_statements(sql)
+
+
+def test_comment_only_statements_are_dropped():
+    assert texts("-- a;\n/* b; */;\nSELECT 1;;") == ["SELECT 1"]
+
+
+def test_unterminated_tokens_at_end():
+    assert texts("SELECT 'abc; SELECT 2") == ["SELECT 'abc; SELECT 2"]
+    assert texts("SELECT 1 /* open; comment") == ["SELECT 1 /* open; comment"]
@@ -0,0 +1,57 @@
+import pytest
+
+from pysqlparse import lexer
+from pysqlparse.tokens import TokenInfo, TokenStream, token_stream, tokenize_batch, type_count_matrix
+
+
+def test_stream_tokens():
+    stream = token_stream("select a, 'x' from t")
+    assert len(stream) == 6
+    assert stream[0] == TokenInfo("keyword", "select", 0, 6)
+    assert stream[3] == TokenInfo("string", "'x'", 10, 13)
+    assert stream[-1] == TokenInfo("identifier", "t", 19, 20)
+    assert [t.text for t in stream] == ["select", "a", ",", "'x'", "from", "t"]
+
+
+def test_stream_whitespace():
+    full = TokenStream.from_statement("select a  from t", skip_whitespace=False)
+    assert [t.type for t in full][:2] == ["keyword", "whitespace"]
+    assert "".join(t.text for t in full) == "select a  from t"
+
+
+def test_stream_bytes_source():
+    stream = token_stream("select 'é' from t".encode("utf-8"))
+    assert stream[1] == TokenInfo("string", "'é'".encode("utf-8"), 7, 11)
+
+
+def test_stream_arrays():
+    stream = token_stream("select a from t")
+    assert stream.type_codes.tolist() == [lexer.KEYWORD, lexer.IDENTIFIER, lexer.KEYWORD, lexer.IDENTIFIER]
+    view = stream.offsets_view()
+    assert view.shape == (4, 2)
+    assert view.tolist()[1] == [7, 8]
+    assert view.readonly
+    assert token_stream("").offsets_view().tolist() == []
+    counts = stream.type_counts()
+    assert counts[lexer.KEYWORD] == 2 and counts[lexer.IDENTIFIER] == 2 and sum(counts) == 4
+    with pytest.raises(TypeError):
+        stream[0:1]
+
+
+def test_batch_layout():
+    batch = tokenize_batch(["select 1", "select a from t", ""])
+    assert batch.row_splits.tolist() == [0, 2, 6, 6]
+    assert len(batch.type_codes) * 2 == len(batch.offsets)
+    assert batch.offsets.tolist()[4:6] == [0, 6]
+
+
+def test_type_count_matrix():
+    batch = tokenize_batch(["select 1", "select a from t where b = 'x'"])
+    matrix = type_count_matrix(batch)
+    assert matrix.shape == (2, len(lexer.TOKEN_TYPES))
+    rows = matrix.tolist()
+    assert rows[0][lexer.KEYWORD] == 1 and rows[0][lexer.NUMBER] == 1
+    assert rows[1][lexer.KEYWORD] == 3 and rows[1][lexer.STRING] == 1 and rows[1][lexer.OPERATOR] == 1
+    for i, statement in enumerate(["select 1", "select a from t where b = 'x'"]):
+        assert rows[i] == token_stream(statement).type_counts()
+    assert type_count_matrix(tokenize_batch([])).tolist() == []
@@ -0,0 +1,64 @@
+import pytest
+
+from pysqlparse import tree
+from pysqlparse.tree import AstList, AstNode
+
+AST = '{"type": "select", "columns": [{"name": "a"}, {"name": "b"}], "from": {"table": "t"}, "limit": null}'
+
+
+def test_fields_as_attributes_and_items():
+    node = tree.loads(AST)
+    assert isinstance(node, AstNode)
+    assert node.type == node["type"] == "select"
+    assert node.limit is None
+    assert node.get("where", 1) == 1
+    assert "from" in node and "where" not in node
+    assert list(node) == ["type", "columns", "from", "limit"]
+    assert len(node) == 4
+
+
+def test_children_are_views():
+    node = tree.loads(AST)
+    assert isinstance(node.columns, AstList)
+    assert isinstance(node.columns[0], AstNode)
+    assert [c.name for c in node.columns] == ["a", "b"]
+    assert node.columns[-1:] == [{"name": "b"}]
+    assert node["from"].table == "t"
+
+
+def test_missing_field():
+    node = tree.loads(AST)
+    with pytest.raises(AttributeError):
+        node.where
+    with pytest.raises(KeyError):
+        node["where"]
+    with pytest.raises(AttributeError):
+        node._private
+
+
+def test_equality_and_copies():
+    node = tree.loads(AST)
+    assert node == tree.loads(AST)
+    assert node != tree.loads('{"type": "insert"}')
+    data = node.to_dict()
+    assert data["columns"][0] == {"name": "a"}
+    data["columns"].append({"name": "c"})
+    assert len(node.columns) == 2
+    assert node.columns.to_list() == [{"name": "a"}, {"name": "b"}]
+    with pytest.raises(TypeError):
+        hash(node)
+
+
+def test_views_are_read_only():
+    node = tree.loads(AST)
+    with pytest.raises(AttributeError):
+        node.type = "insert"
+    with pytest.raises(TypeError):
+        node.columns[0] = None
+
+
+def test_array_root():
+    root = tree.loads('[{"type": "select"}, 1]')
+    assert isinstance(root, AstList)
+    assert root[0].type == "select"
+    assert root[1] == 1